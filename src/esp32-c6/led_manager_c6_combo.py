@@ -1,119 +1,187 @@
 # =============================================================================
 # Project  : Unforgotten – ESP BLE Scale
 # File     : led_manager_c6_combo.py
-# Version  : 1.4.0
+# Version  : 1.6.0
 # Author   : you
 # Summary  : ESP32-C6 LED manager that drives BOTH a NeoPixel (GPIO8) and
 #            external discrete RGB LEDs (GPIO 18/19/20) in perfect sync.
 # Behavior : Non-blocking LED state machine (blue=conn, green=activity, red=error)
+#            shared via lib.led_base; this class only drives the hardware.
 # Purpose  : Match clarification: C6 must blink NeoPixel + pins together
 # Style    : Clear on/off API + tiny helpers
 # =============================================================================
 
-import time
-from machine import Pin
-from time import ticks_ms, ticks_diff
+import micropython
+from machine import Pin, SPI, Timer
+from micropython import const, schedule
+from lib.led_base import BaseLedManager
 try:
     import neopixel
 except ImportError:
     neopixel = None
 
+# ESP32-C6 GPIO output set/clear registers (GPIO0..31)
+_GPIO_OUT_W1TS = const(0x60091008)
+_GPIO_OUT_W1TC = const(0x6009100C)
+
+@micropython.viper
+def _gpio_w(set_mask:uint, clr_mask:uint):
+    # write-1-to-set / write-1-to-clear: no read cycle, atomic vs. IRQs
+    ptr32(_GPIO_OUT_W1TS)[0] = set_mask
+    ptr32(_GPIO_OUT_W1TC)[0] = clr_mask
+
+# WS2812 over SPI MOSI @ 3.2 MHz: one data bit -> one nibble (1000=0, 1110=1),
+# so each SPI byte carries two WS2812 bits (index = those two bits)
+_WS_BAUD = const(3_200_000)
+_WS_NIB  = (0x88, 0x8E, 0xE8, 0xEE)
+
 def _scale(rgb, b):
     r,g,bb = rgb
     return (int(r*b), int(g*b), int(bb*b))
 
-class C6ComboLEDManager:
-    C_OFF=(0,0,0); C_B=(0,0,255); C_G=(0,255,0); C_R=(255,0,0)
+def _ws_encode(pixels):
+    # pixels: iterable of (r,g,b) -> SPI frame (GRB order, 12 bytes per pixel)
+    out=bytearray()
+    for r,g,b in pixels:
+        for c in (g,r,b):
+            out.append(_WS_NIB[(c>>6)&3]); out.append(_WS_NIB[(c>>4)&3])
+            out.append(_WS_NIB[(c>>2)&3]); out.append(_WS_NIB[c&3])
+    return bytes(out)
+
+class C6ComboLEDManager(BaseLedManager):
+    # (brightness, count, index) -> (scaled palette, SPI frames), shared by all instances
+    _PALETTE_CACHE = {}
 
     def __init__(
         self,
         *,
         # NeoPixel
-        np_pin, np_count=1, np_index=0, np_brightness=0.2,
+        np_pin, np_count=1, np_index=0, np_brightness=0.2, np_spi_id=1,
         # Discrete RGB
         blue_pin, green_pin, red_pin, active_low_rgb=False,
         # Timings
         blue_blink_period_ms=1000,
         green_pulse_window_ms=600, green_blink_period_ms=200,
-        red_error_window_ms=2000,  red_blink_period_ms=180,
-        self_test=True
+        red_error_window_ms=2000,  red_blink_period_ms=180, snap_pow2=False,
+        self_test=True,
+        # Background refresh: None = caller polls update(); with a timer id
+        # the timer is the only driver, the caller must not call update()
+        timer_id=None, tick_ms=90
     ):
-        # NeoPixel init
-        self._np_ok=False; self._np=None
-        self._idx=int(np_index); self._b=float(np_brightness)
-        if neopixel:
+        # NeoPixel init: SPI MOSI (no IRQ-off bit-bang), fallback neopixel module
+        self._np_ok=False; self._np=None; self._spi=None
+        self._idx=int(np_index); self._n=int(np_count); self.set_brightness(np_brightness)
+        if np_spi_id is not None:
             try:
-                self._np = neopixel.NeoPixel(Pin(np_pin, Pin.OUT), int(np_count))
+                self._spi = SPI(np_spi_id, baudrate=_WS_BAUD, polarity=0, phase=0, bits=8, firstbit=SPI.MSB, mosi=Pin(np_pin))
                 self._np_ok=True
             except Exception as e:
-                print("[C6Combo] NeoPixel init error:", e)
-        else:
-            print("[C6Combo] neopixel module missing.")
+                print("[C6Combo] SPI NeoPixel init error:", e)
+        if self._spi is None:
+            if neopixel:
+                try:
+                    self._np = neopixel.NeoPixel(Pin(np_pin, Pin.OUT), self._n)
+                    self._np_ok=True
+                except Exception as e:
+                    print("[C6Combo] NeoPixel init error:", e)
+            else:
+                print("[C6Combo] neopixel module missing.")
 
         # Discrete RGB init
         self._blue  = Pin(blue_pin,  Pin.OUT, value=0)
         self._green = Pin(green_pin, Pin.OUT, value=0)
         self._red   = Pin(red_pin,   Pin.OUT, value=0)
         self._low   = active_low_rgb
+        self._r_val=self._red.value; self._g_val=self._green.value; self._b_val=self._blue.value
 
-        # State + timings
-        self._connected=False; self._t_xfer=None; self._t_err=None
-        self._p_blue=int(blue_blink_period_ms)
-        self._w_green=int(green_pulse_window_ms); self._p_green=int(green_blink_period_ms)
-        self._w_red=int(red_error_window_ms);     self._p_red=int(red_blink_period_ms)
+        # W1TS/W1TC masks per palette colour; active-low folded in here, once
+        self._m_r=1<<red_pin; self._m_g=1<<green_pin; self._m_b=1<<blue_pin
+        self._mask=self._m_r|self._m_g|self._m_b
+        self._reg_ok = max(red_pin,green_pin,blue_pin) < 32
+        self._gm=[self._masks(rgb) for rgb in self.RGB]
+
+        # State + timings (shared ladder in BaseLedManager)
+        self._init_state(blue_blink_period_ms, green_pulse_window_ms, green_blink_period_ms,
+                         red_error_window_ms, red_blink_period_ms, snap_pow2)
 
         # Self-test / initial off
         self._set_rgb(self.C_OFF)
-        if self._np_ok and self_test:
-            for c in (self.C_R,self.C_G,self.C_B,self.C_OFF):
-                self._set_rgb(c); time.sleep(0.12)
-
-    # ----- explicit on/off style API -----------------------------------------
-    def on_connect(self):    self._connected=True;  self._set_rgb(self.C_B)
-    def on_disconnect(self): self._connected=False; self._t_xfer=None
-    def on_transfer(self):   self._t_xfer=ticks_ms()
-    def on_error(self):      self._t_err=ticks_ms()
-    def off_all(self):       self._set_rgb(self.C_OFF)
-
-    def update(self):
-        now=ticks_ms()
-
-        # Error dominates
-        if self._win(now,self._t_err,self._w_red):
-            v=self._blink(now,self._p_red); self._set_rgb(self.C_R if v else self.C_OFF); return
-
-        # Activity pulse
-        if self._connected and self._win(now,self._t_xfer,self._w_green):
-            v=self._blink(now,self._p_green); self._set_rgb(self.C_G if v else self.C_OFF); return
-
-        # Baseline
-        if self._connected:
-            self._set_rgb(self.C_B)
-        else:
-            v=self._blink(now,self._p_blue); self._set_rgb(self.C_B if v else self.C_OFF)
-
-    # ----- helpers ------------------------------------------------------------
-    @staticmethod
-    def _win(now,t0,win):   return (t0 is not None) and (ticks_diff(now,t0) < win)
-    @staticmethod
-    def _blink(now,period): return 0 if period<=0 else ((now // (period // 2 or 1)) & 1)
+        if self._np_ok and self_test: self._start_self_test()
 
+        # Timer -> schedule(update): LED timing no longer depends on the main loop
+        self._timer=None; self._run_ref=self._run
+        if timer_id is not None:
+            try:
+                self._timer=Timer(timer_id)
+                self._timer.init(period=int(tick_ms), mode=Timer.PERIODIC, callback=self._tick)
+            except Exception as e:
+                print("[C6Combo] Timer init error:", e)
+                self._timer=None
+
+    def deinit(self):
+        # Stop background refresh and leave the LEDs dark
+        if self._timer is not None:
+            self._timer.deinit(); self._timer=None
+        self._show(self.C_OFF,0)
+
+    def set_brightness(self, b):
+        # Pre-scaled palette: no float math / tuple alloc on the hot path
+        self._b=float(b)
+        key=(self._b,self._n,self._idx)
+        pal=C6ComboLEDManager._PALETTE_CACHE.get(key)
+        if pal is None:
+            scaled=[_scale(rgb,self._b) for rgb in self.RGB]
+            # Full-strip SPI frames per palette colour (only _idx lit)
+            off=scaled[self.C_OFF]
+            enc=[_ws_encode(s if i==self._idx else off for i in range(self._n)) for s in scaled]
+            pal=C6ComboLEDManager._PALETTE_CACHE[key]=(scaled,enc)
+        self._scaled,self._enc=pal
+        self._last_np=-1   # force the next NeoPixel write with the new palette
+
+    # ----- timer plumbing -----------------------------------------------------
+    def _tick(self, t):
+        # IRQ context: defer the real work (pre-bound ref, no alloc here)
+        try:
+            schedule(self._run_ref, 0)
+        except RuntimeError:
+            pass  # schedule queue full; catch up on the next tick
+
+    def _run(self, _):
+        try:
+            self.update()
+        except Exception as e:
+            print("[C6Combo] update error:", e)
+
+    # ----- hardware -----------------------------------------------------------
+    def _apply(self, c, on): self._set_rgb(c if on else self.C_OFF)
+
+    @micropython.native
     def _set_rgb(self, rgb):
-        # drive NeoPixel
-        if self._np_ok:
+        # drive NeoPixel (only when its colour changes; off-phases of different states look alike)
+        if self._np_ok and rgb != self._last_np:
             try:
-                self._np[self._idx]=_scale(rgb,self._b)
-                self._np.write()
+                if self._spi is not None:
+                    self._spi.write(self._enc[rgb])
+                else:
+                    self._np[self._idx]=self._scaled[rgb]
+                    self._np.write()
+                self._last_np=rgb
             except Exception as e:
                 print("[C6Combo] NeoPixel write error:", e)
                 self._np_ok=False
 
         # drive discrete
+        sm,cm = self._gm[rgb]
+        if self._reg_ok:
+            _gpio_w(sm,cm); return
+        # unconditional writes: a read-back costs as much as the store
+        self._r_val(1 if sm & self._m_r else 0)
+        self._g_val(1 if sm & self._m_g else 0)
+        self._b_val(1 if sm & self._m_b else 0)
+
+    def _masks(self, rgb):
+        # (set, clear) register masks for one palette colour, polarity applied
         r,g,b = rgb
-        self._pin_set(self._red,   1 if r else 0)
-        self._pin_set(self._green, 1 if g else 0)
-        self._pin_set(self._blue,  1 if b else 0)
-
-    def _pin_set(self, pin, v):
-        if self._low: v = 0 if v else 1
-        if pin.value()!=v: pin.value(v)
+        bits = (self._m_r if r else 0) | (self._m_g if g else 0) | (self._m_b if b else 0)
+        if self._low: bits ^= self._mask
+        return bits, self._mask & ~bits
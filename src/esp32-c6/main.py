@@ -13,6 +13,8 @@
 # =============================================================================
 
 from time import sleep
+from machine import Timer
+from micropython import schedule
 
 from lib.unforgotten_v3 import BLEScale
 
@@ -26,12 +28,28 @@ def main():
         print("Fatal error:", e)
         try:
             scale.leds.on_error()
-            for _ in range(15):
-                scale.leds.update()
-                sleep(0.08)
+            if getattr(scale.leds, "_timer", None) is not None:
+                # The manager's own timer already drives update()
+                sleep(1.2)
+            else:
+                # Error blink driven by a timer (scheduled, not run in the IRQ) instead of the loop
+                upd = scale.leds.update
+                def tick(_):
+                    try:
+                        schedule(upd, None)
+                    except RuntimeError:
+                        pass  # schedule queue full; catch up on the next tick
+                t = Timer(1)
+                t.init(period=80, mode=Timer.PERIODIC, callback=tick)
+                try:
+                    sleep(1.2)
+                finally:
+                    t.deinit()
         except:
             pass
     finally:
+        if hasattr(scale.leds, "deinit"):
+            scale.leds.deinit()
         scale.leds.off_all()
         print("Shutdown complete.")
 
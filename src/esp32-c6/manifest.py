@@ -0,0 +1,17 @@
+# =============================================================================
+# File    : manifest.py  (ESP32-C6)
+# Purpose : Freeze the board constants + LED managers into the firmware as
+#           bytecode (no source parse / heap copy at boot).
+# Build   : make BOARD=ESP32_GENERIC_C6 FROZEN_MANIFEST=<repo>/src/esp32-c6/manifest.py
+# Note    : const() is folded at freeze time inside each module; float values
+#           (e.g. NEOPIXEL_BRIGHTNESS) stay plain globals but are frozen too.
+# =============================================================================
+include("$(PORT_DIR)/boards/manifest.py")
+
+module("c6_const.py")
+module("led_manager_c6_combo.py")
+module("led_manager_mono_c6.py")
+module("led_manager_rgb_c6.py")
+
+# lib/ is not frozen: a partial frozen "lib" package would shadow (or be
+# shadowed by) the lib/ directory on the board, which holds the rest of it
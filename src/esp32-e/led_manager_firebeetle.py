@@ -1,16 +1,28 @@
 # =============================================================================
 # Discrete RGB manager – Non-blocking, readable; great for FireBeetle 2
 # =============================================================================
+import micropython
 from machine import Pin
-from time import ticks_ms, ticks_diff
+from micropython import const
+from lib.led_base import BaseLedManager
 
-class RGBLedManager:
+# ESP32 GPIO output set/clear registers (GPIO0..31)
+_GPIO_OUT_W1TS = const(0x3FF44008)
+_GPIO_OUT_W1TC = const(0x3FF4400C)
+
+@micropython.viper
+def _gpio_w(set_mask:uint, clr_mask:uint):
+    # write-1-to-set / write-1-to-clear: no read cycle, atomic vs. IRQs
+    ptr32(_GPIO_OUT_W1TS)[0] = set_mask
+    ptr32(_GPIO_OUT_W1TC)[0] = clr_mask
+
+class RGBLedManager(BaseLedManager):
     def __init__(
         self, blue_pin, green_pin, red_pin, *,
         mono_led_pin=None, active_low_rgb=False, active_low_mono=False,
         blue_blink_period_ms=1000,
         green_pulse_window_ms=600, green_blink_period_ms=200,
-        red_error_window_ms=2000, red_blink_period_ms=180
+        red_error_window_ms=2000, red_blink_period_ms=180, snap_pow2=False
     ):
         self._blue  = Pin(blue_pin,  Pin.OUT, value=0)
         self._green = Pin(green_pin, Pin.OUT, value=0)
@@ -19,58 +31,46 @@ class RGBLedManager:
 
         self._rgb_low  = active_low_rgb
         self._mono_low = active_low_mono
+        self._set_mono = (self._mono_none if self._mono is None else
+                          self._mono_inv if active_low_mono else self._mono_high)
 
-        self._connected = False
-        self._last_transfer_ms = None
-        self._last_error_ms = None
-
-        self._blue_period  = int(blue_blink_period_ms)
-        self._green_window = int(green_pulse_window_ms)
-        self._green_period = int(green_blink_period_ms)
-        self._red_window   = int(red_error_window_ms)
-        self._red_period   = int(red_blink_period_ms)
-
-    # Events
-    def on_connect(self):    self._connected = True;  self._set_rgb(self._blue,1); self._set_rgb(self._green,0); self._set_rgb(self._red,0); self._set_mono(1)
-    def on_disconnect(self): self._connected = False; self._last_transfer_ms = None
-    def on_transfer(self):   self._last_transfer_ms = ticks_ms()
-    def on_error(self):      self._last_error_ms = ticks_ms()
-    def off_all(self):       self._set_rgb(self._blue,0); self._set_rgb(self._green,0); self._set_rgb(self._red,0); self._set_mono(0)
+        # W1TS/W1TC masks per (colour, phase); active-low folded in here, once
+        self._m_r = 1 << red_pin; self._m_g = 1 << green_pin; self._m_b = 1 << blue_pin
+        self._mask = self._m_r | self._m_g | self._m_b
+        self._reg_ok = max(red_pin, green_pin, blue_pin) < 32
+        m = self._masks
+        # transfer pulses green over solid blue
+        self._gm = [(m(0, 0, 0), m(0, 0, 0)),   # C_OFF
+                    (m(0, 0, 0), m(1, 0, 0)),   # C_R
+                    (m(0, 0, 1), m(0, 1, 1)),   # C_G
+                    (m(0, 0, 0), m(0, 0, 1))]   # C_B
 
-    def update(self):
-        now = ticks_ms()
+        self._init_state(blue_blink_period_ms, green_pulse_window_ms, green_blink_period_ms,
+                         red_error_window_ms, red_blink_period_ms, snap_pow2)
 
-        if self._win(now, self._last_error_ms, self._red_window):
-            v = self._blink(now, self._red_period)
-            self._set_rgb(self._red, v); self._set_rgb(self._green,0); self._set_rgb(self._blue,0); self._set_mono(v)
-            return
+    # Hardware
+    def _apply(self, c, on):
+        # mono follows the blink phase, solid while a transfer pulses
+        sm, cm = self._gm[c][on]
+        self._write_masks(sm, cm)
+        self._set_mono(1 if c == self.C_G else on)
 
-        if self._connected and self._win(now, self._last_transfer_ms, self._green_window):
-            v = self._blink(now, self._green_period)
-            self._set_rgb(self._green, v); self._set_mono(v)
-        else:
-            self._set_rgb(self._green, 0)
+    def _masks(self, r, g, b):
+        # (set, clear) register masks for one RGB level, polarity applied
+        bits = (self._m_r if r else 0) | (self._m_g if g else 0) | (self._m_b if b else 0)
+        if self._rgb_low: bits ^= self._mask
+        return bits, self._mask & ~bits
 
-        if self._connected:
-            self._set_rgb(self._blue, 1); self._set_mono(1)
-        else:
-            v = self._blink(now, self._blue_period)
-            self._set_rgb(self._blue, v); self._set_mono(v)
-
-    # Helpers
-    @staticmethod
-    def _win(now, start, window_ms): return (start is not None) and (ticks_diff(now, start) < window_ms)
+    def _write_masks(self, sm, cm):
+        if self._reg_ok:
+            _gpio_w(sm, cm); return
+        self._set_rgb(self._red,   1 if sm & self._m_r else 0)
+        self._set_rgb(self._green, 1 if sm & self._m_g else 0)
+        self._set_rgb(self._blue,  1 if sm & self._m_b else 0)
     @staticmethod
-    def _blink(now, period): 
-        if period <= 0: return 0
-        half = period // 2 or 1
-        return (now // half) & 1
-
-    def _set_rgb(self, pin, v):
-        if self._rgb_low: v = 0 if v else 1
-        if pin.value() != v: pin.value(v)
-
-    def _set_mono(self, v):
-        if self._mono is None: return
-        if self._mono_low: v = 0 if v else 1
-        if self._mono.value() != v: self._mono.value(v)
+    def _set_rgb(pin, v):
+        pin.value(v)
+    # _set_mono is bound to one of these at construction (no per-call polarity test)
+    def _mono_none(self, v): pass
+    def _mono_high(self, v): self._mono.value(v)
+    def _mono_inv(self, v):  self._mono.value(1 - v)
@@ -1,93 +1,104 @@
 # =============================================================================
 # NeoPixel RGB manager (FireBeetle 2 onboard WS2812 on GPIO2)
 # =============================================================================
-import time
 from machine import Pin
-from time import ticks_ms, ticks_diff
+from micropython import const
+from lib.led_base import BaseLedManager
+try:
+    import esp32
+except ImportError:
+    esp32 = None
 try:
     import neopixel
 except ImportError:
     neopixel = None
 
+# WS2812 bit timings for esp32.RMT at clock_div=2 (80 MHz APB -> 25 ns ticks)
+_T0H = const(16); _T0L = const(34)   # 0.40 / 0.85 us
+_T1H = const(32); _T1L = const(18)   # 0.80 / 0.45 us
+
 def _scale(rgb, b):
     r,g,bv = rgb
     return (int(r*b), int(g*b), int(bv*b))
 
-class FireBeetleRGBManager:
-    C_OFF=(0,0,0); C_B=(0,0,255); C_G=(0,255,0); C_R=(255,0,0)
+def _rmt_pulses(pixels):
+    # (r,g,b) pixels -> RMT high/low durations (GRB order, MSB first)
+    out=[]
+    for r,g,b in pixels:
+        for c in (g,r,b):
+            for i in range(7,-1,-1):
+                if (c>>i)&1: out.append(_T1H); out.append(_T1L)
+                else:        out.append(_T0H); out.append(_T0L)
+    return tuple(out)
+
+class FireBeetleRGBManager(BaseLedManager):
+    # (brightness, count, index) -> (scaled palette, pulse trains), shared by all instances
+    _PALETTE_CACHE = {}
 
     def __init__(
-        self, np_pin, *, np_count=1, np_index=0, np_brightness=0.2,
+        self, np_pin, *, np_count=1, np_index=0, np_brightness=0.2, rmt_channel=0,
         mono_led_pin=None, active_low_mono=False,
         blue_blink_period_ms=1000, green_pulse_window_ms=600, green_blink_period_ms=200,
-        red_error_window_ms=2000, red_blink_period_ms=180, self_test=True
+        red_error_window_ms=2000, red_blink_period_ms=180, self_test=True, snap_pow2=False
     ):
-        self._ok=False; self._np=None
-        self._idx=int(np_index); self._b=float(np_brightness)
-        if neopixel:
+        # RMT peripheral generates the waveform in hardware; neopixel is the fallback
+        self._ok=False; self._np=None; self._rmt=None
+        self._idx=int(np_index); self._n=int(np_count); self.set_brightness(np_brightness)
+        if esp32 and rmt_channel is not None:
             try:
-                self._np = neopixel.NeoPixel(Pin(np_pin, Pin.OUT), int(np_count))
+                self._rmt = esp32.RMT(rmt_channel, pin=Pin(np_pin, Pin.OUT), clock_div=2)
                 self._ok=True
             except Exception as e:
-                print("[NeoPixel] init error:", e)
-        else:
-            print("[NeoPixel] module missing.")
+                print("[NeoPixel] RMT init error:", e)
+        if self._rmt is None:
+            if neopixel:
+                try:
+                    self._np = neopixel.NeoPixel(Pin(np_pin, Pin.OUT), self._n)
+                    self._ok=True
+                except Exception as e:
+                    print("[NeoPixel] init error:", e)
+            else:
+                print("[NeoPixel] module missing.")
 
         self._mono = Pin(mono_led_pin, Pin.OUT, value=0) if mono_led_pin is not None else None
         self._mono_low = active_low_mono
+        self._set_mono = (self._mono_none if self._mono is None else
+                          self._mono_inv if active_low_mono else self._mono_high)
 
-        self._connected=False; self._t_xfer=None; self._t_err=None
-        self._blue_period=int(blue_blink_period_ms)
-        self._green_window=int(green_pulse_window_ms); self._green_period=int(green_blink_period_ms)
-        self._red_window=int(red_error_window_ms);     self._red_period=int(red_blink_period_ms)
+        self._init_state(blue_blink_period_ms, green_pulse_window_ms, green_blink_period_ms,
+                         red_error_window_ms, red_blink_period_ms, snap_pow2)
 
         self._set_rgb(self.C_OFF); self._set_mono(0)
-        if self._ok and self_test:
-            for c in (self.C_R,self.C_G,self.C_B,self.C_OFF):
-                self._set_rgb(c); time.sleep(0.12)
-
-    # on/off style calls
-    def on_connect(self):    self._connected=True;  self._set_rgb(self.C_B); self._set_mono(1)
-    def on_disconnect(self): self._connected=False; self._t_xfer=None
-    def on_transfer(self):   self._t_xfer=ticks_ms()
-    def on_error(self):      self._t_err=ticks_ms()
-    def off_all(self):       self._set_rgb(self.C_OFF); self._set_mono(0)
-
-    def update(self):
-        now=ticks_ms()
-
-        if self._win(now,self._t_err,self._red_window):
-            v=self._blink(now,self._red_period)
-            self._set_rgb(self.C_R if v else self.C_OFF); self._set_mono(v); return
-
-        if self._connected and self._win(now,self._t_xfer,self._green_window):
-            v=self._blink(now,self._green_period)
-            self._set_rgb(self.C_G if v else self.C_OFF); self._set_mono(v); return
+        if self._ok and self_test: self._start_self_test()
 
-        if self._connected:
-            self._set_rgb(self.C_B); self._set_mono(1)
-        else:
-            v=self._blink(now,self._blue_period)
-            self._set_rgb(self.C_B if v else self.C_OFF); self._set_mono(v)
+    def set_brightness(self, b):
+        # Pre-scaled palette: no float math / tuple alloc on the hot path
+        self._b=float(b)
+        key=(self._b,self._n,self._idx)
+        pal=FireBeetleRGBManager._PALETTE_CACHE.get(key)
+        if pal is None:
+            scaled=[_scale(rgb,self._b) for rgb in self.RGB]
+            # Full-strip RMT pulse trains per palette colour (only _idx lit)
+            off=scaled[self.C_OFF]
+            pulses=[_rmt_pulses(s if i==self._idx else off for i in range(self._n)) for s in scaled]
+            pal=FireBeetleRGBManager._PALETTE_CACHE[key]=(scaled,pulses)
+        self._scaled,self._pulses=pal
 
-    @staticmethod
-    def _win(now,t0,win): return (t0 is not None) and (ticks_diff(now,t0) < win)
-    @staticmethod
-    def _blink(now,period):
-        if period<=0: return 0
-        half=period//2 or 1
-        return (now//half)&1
+    def _apply(self, c, on): self._set_rgb(c if on else self.C_OFF); self._set_mono(on)
 
     def _set_rgb(self, rgb):
         if not self._ok: return
         try:
-            self._np[self._idx]=_scale(rgb,self._b)
-            self._np.write()
+            if self._rmt is not None:
+                self._rmt.write_pulses(self._pulses[rgb], 1)  # start high
+            else:
+                self._np[self._idx]=self._scaled[rgb]
+                self._np.write()
         except Exception as e:
             print("[NeoPixel] write error:", e)
             self._ok=False
 
-    def _set_mono(self, v):
-        if self._mono is None: return
-        if self._mono_low: v = 0 if v else 1
-        if self._mono.value()!=v: self._mono.value(v)
+    # _set_mono is bound to one of these at construction (no per-call polarity test)
+    def _mono_none(self, v): pass
+    def _mono_high(self, v): self._mono.value(v)
+    def _mono_inv(self, v):  self._mono.value(1 - v)
@@ -0,0 +1,18 @@
+# =============================================================================
+# File    : manifest.py  (FireBeetle 2 ESP32-E)
+# Purpose : Freeze the board constants + LED managers into the firmware as
+#           bytecode (no source parse / heap copy at boot).
+# Build   : make BOARD=ESP32_GENERIC FROZEN_MANIFEST=<repo>/src/esp32-e/manifest.py
+# Note    : const() is folded at freeze time inside each module; float values
+#           (e.g. NEOPIXEL_BRIGHTNESS) stay plain globals but are frozen too.
+# =============================================================================
+include("$(PORT_DIR)/boards/manifest.py")
+
+module("common_const_firebeetle2.py")
+module("firebeetle_const.py")
+module("gatt_defs.py")
+module("led_manager_firebeetle.py")
+module("led_manager_rgb_firebeetle.py")
+
+# lib/ is not frozen: a partial frozen "lib" package would shadow (or be
+# shadowed by) the lib/ directory on the board, which holds the rest of it
@@ -0,0 +1,26 @@
+# =============================================================================
+# File    : manifest.py  (ESP32-S3)
+# Purpose : Freeze the board constants, BLE scale modules, GATT schema and
+#           PowerManager into the firmware as bytecode (no source parse /
+#           heap copy at boot).
+#           @micropython.viper/native functions are compiled for the target
+#           when frozen (needs the port's native arch, set by the S3 port).
+# Build   : make BOARD=ESP32_GENERIC_S3 FROZEN_MANIFEST=<repo>/src/esp32-s3/manifest.py
+# Note    : const() is folded at freeze time inside the module; float values
+#           (e.g. NEOPIXEL_BRIGHTNESS) stay plain globals but are frozen too.
+# =============================================================================
+include("$(PORT_DIR)/boards/manifest.py")
+
+module("s3_const.py")
+module("unf_s3.py")
+module("unf_s3_v1_3_1.py", opt=3)
+module("unf_s3_v1_3_2.py", opt=3)
+
+# GATT schema, imported top-level as gatt_defs by the v1.3.x modules
+module("gatt_defs.py", base_path="../lib", opt=3)
+
+# PowerManager, imported top-level as power_manager by the v1.3.x modules
+module("power_manager.py", base_path="../lib", opt=3)
+
+# lib.* stays on the filesystem: a partial frozen "lib" package would shadow
+# (or be shadowed by) the lib/ directory on the board, which holds the rest
@@ -9,7 +9,8 @@
 # Style    : Small methods; explicit control calls; safe fallbacks
 # =============================================================================
 
-from time import sleep
+from time import sleep, sleep_ms, ticks_ms, ticks_diff, ticks_add
+import micropython
 from micropython import const
 from bluetooth import BLE
 import ujson
@@ -31,6 +32,86 @@ from lib.common_const import (
     IRQ_GATTS_READ_REQUEST,
 )
 
+# Runtime logging (IRQ / TX / RX / loop); 0 lets the compiler drop the prints
+_LOG = const(0)
+
+# TX JSON fragments (fixed schema, built without a dict / ujson.dumps)
+_TX_WEIGHT_PFX = b'{"from":"weight","weight":'
+_GEO_FMT       = (b',"weight":%.3f,"time":%d,"latitude":%.6f,"longitude":%.6f,'
+                  b'"speed":%.3f,"altitude":%.2f,"accuracy":%.2f')
+_TX_FUSED_FMT  = b'{"from":"fused"' + _GEO_FMT
+_TX_GPS_FMT    = b'{"from":"gps"' + _GEO_FMT
+_TX_IDLE_T     = b',"idle":true}'
+_TX_IDLE_F     = b',"idle":false}'
+
+# Per-characteristic GATT RX buffer (append mode fuses back-to-back writes)
+_RX_GATT_BUF = const(1024)
+
+# run() wait slice: upper bound on wake latency after a BLE event
+_WAKE_POLL_MS = const(20)
+
+# run() periods: LED animation, and weight sampling per power state
+_LED_PERIOD_MS    = const(90)
+_WEIGHT_PERIOD_MS = const(500)    # active load, faster updates
+_IDLE_PERIOD_MS   = const(2000)   # idle but not long enough
+_DEEP_PERIOD_MS   = const(5000)   # deep idle
+
+# Advertising interval (us)
+_ADV_INTERVAL_US = const(500_000)
+
+# While idle, a weight sampled this recently is reused instead of re-reading the HX711
+_SAMPLE_CACHE_MS = const(200)
+
+# Active-mode HX711 sampling: samples averaged per reading, restart if stuck this long
+_ACTIVE_SAMPLES = const(3)
+_SAMPLE_TIMEOUT_MS = const(1000)
+
+# RX JSON keys copied into fused_rx_data / gps_rx_data
+_ALLOWED_GEO_KEYS = ("latitude", "longitude", "altitude", "speed", "time", "accuracy")
+# Reset values for fused_rx_data / gps_rx_data
+_GEO_ZERO = {
+    "time": 0,
+    "latitude": 0.0,
+    "longitude": 0.0,
+    "speed": 0.0,
+    "altitude": 0.0,
+    "accuracy": 0.0,
+}
+# (quoted key as bytes, dict key, converter) for the fixed-schema scanner
+_GEO_FIELDS = tuple((b'"' + k.encode() + b'"', k, int if k == "time" else float)
+                    for k in _ALLOWED_GEO_KEYS)
+
+
+@micropython.viper
+def _value_end(buf: ptr8, n: int, j: int) -> int:
+    # Index of the ',' or '}' closing the value that starts at j (-1 = none)
+    while j < n:
+        c = buf[j]
+        if c == 0x2C or c == 0x7D:
+            return j
+        j += 1
+    return -1
+
+
+def _parse_geo(buf, target):
+    """
+    Single-pass scan of one flat JSON line for the known geo keys.
+    Raises ValueError on anything it cannot convert (caller falls back to ujson).
+    """
+    find = buf.find
+    n = len(buf)
+    for qk, k, conv in _GEO_FIELDS:
+        i = find(qk)
+        if i < 0:
+            continue
+        j = find(b":", i + len(qk)) + 1
+        if j <= 0:
+            raise ValueError("no ':' after key")
+        e = _value_end(buf, n, j)
+        if e < 0:
+            raise ValueError("unterminated value")
+        target[k] = conv(buf[j:e].strip())
+
 
 class BLEScale:
     def __init__(self, name="ESP32S3"):
@@ -45,43 +126,49 @@ class BLEScale:
         self.ble = BLE()
         self.ble.active(True)
         self.ble.config(mtu=100)
+        # Event id -> bound handler, built before the IRQ can fire
+        self._irq_dispatch = {
+            IRQ_CENTRAL_CONNECT: self.on_connect,
+            IRQ_CENTRAL_DISCONNECT: self.on_disconnect,
+            IRQ_GATTS_WRITE: self.on_write,
+            IRQ_GATTS_READ_REQUEST: self.on_read,
+        }
         self.ble.irq(self.irq)
 
     def init_state(self):
         self._connections = set()
         self.connected = False
 
+        # Set by the BLE IRQ handlers to cut run()'s wait short
+        self._wake = False
+        # Advertising start failed; run() retries with a stop-first restart
+        self._adv_retry = False
+
         # Last measured weight **in kilograms** sent to the phone
         self.weight_tx = 0.0
 
-        # Partial received data buffer for JSON lines
-        self.rx_buffer = b""
+        # Partial received data buffer for JSON lines (unterminated tail only)
+        self.rx_buffer = bytearray()
 
         # Last raw weight in grams (for debug if needed)
         self.last_weight_g = 0.0
+        # ticks_ms() of the last HX711 read (start "stale" so the first call reads)
+        self._last_sample_ms = ticks_add(ticks_ms(), -_SAMPLE_CACHE_MS)
+
+        # Active-mode sampler (LowPowerScale.start_sample / poll_sample),
+        # collected by run() whenever HX711 DOUT is low (data ready)
+        self._sampling = False
+        self._sample_t0 = 0
 
         # ─────────────────────────────────────────────────────────────
         # RX data buffers for fused and GPS (received from Android)
         # ─────────────────────────────────────────────────────────────
-        self.fused_rx_data = {
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
-        self.gps_rx_data = {
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
+        # Allocated once; clear() and RX updates modify them in place
+        self.fused_rx_data = dict(_GEO_ZERO)
+        self.gps_rx_data = dict(_GEO_ZERO)
 
-        # tx_data is built per-request in send_tx_as_json_response()
-        self.tx_data = {}
+        # Last TX payload (bytes), kept for debugging only
+        self.tx_data = b""
 
     def init_sensors(self):
         # HX711 load cell amplifier.
@@ -135,165 +222,137 @@ class BLEScale:
             ),
         ) = self.ble.gatts_register_services((WEIGHT_SERVICE,))
         print("BLE services registered (GATT schema = %s)" % GATT_SCHEMA_VERSION)
+        for h in (self.fused_rx_handle, self.gps_rx_handle):
+            try:
+                self.ble.gatts_set_buffer(h, _RX_GATT_BUF, True)
+            except (AttributeError, OSError) as e:
+                print("gatts_set_buffer failed:", e)
         self._payload = advertising_payload(name=name, services=[WEIGHT_SERVICE_UUID])
         self.advertise()
 
-    # ---- BLE IRQs ------------------------------------------------------------
+    # ---- BLE IRQs (native: hot dispatch paths) -------------------------------
+    @micropython.native
     def irq(self, event, data):
-        if event == IRQ_CENTRAL_CONNECT:
-            self.on_connect(data)
-        elif event == IRQ_CENTRAL_DISCONNECT:
-            self.on_disconnect(data)
-        elif event == IRQ_GATTS_WRITE:
-            self.on_write(data)
-        elif event == IRQ_GATTS_READ_REQUEST:
-            self.on_read(data)
+        h = self._irq_dispatch.get(event)
+        if h is not None:
+            h(data)
 
+    @micropython.native
     def on_connect(self, data):
-        conn_handle, _, _ = data
+        conn_handle = data[0]
         self._connections.add(conn_handle)
         self.connected = True
         self.leds.on_connect()
-        print("New connection:", conn_handle)
+        self._wake = True
+        if _LOG: print("New connection:", conn_handle)
 
     def on_disconnect(self, data):
-        conn_handle, _, _ = data
+        conn_handle = data[0]
         self._connections.discard(conn_handle)
         self.connected = False
         self.leds.on_disconnect()
+        self._wake = True
         self.advertise()
         self.clear()
-        print("Disconnected:", conn_handle)
+        if _LOG: print("Disconnected:", conn_handle)
 
+    @micropython.native
     def on_write(self, data):
-        _conn, h = data
-        raw = self.ble.gatts_read(h)
+        h = data[1]
         # Use the robust line-based JSON parser
-        self.save_received_data_1(h, raw)
+        self.save_received_data_1(h, self.ble.gatts_read(h))
         self.leds.on_transfer()
+        self._wake = True
 
+    @micropython.native
     def on_read(self, data):
-        _conn, h = data
-        self.reply_tx(h)
+        self.reply_tx(data[1])
         self.leds.on_transfer()
+        self._wake = True
 
     # ---- Advertising ---------------------------------------------------------
-    def advertise(self, interval_us=500_000):
+    def advertise(self, interval_us=_ADV_INTERVAL_US, force_restart=False):
         """
         Start BLE advertising so the device can be discovered.
-        Called on startup and on disconnect.
+        Called on startup and on disconnect (advertising is already off then).
+
+        force_restart stops any previous advertising first. If starting fails,
+        run() retries on its next pass instead of sleeping here.
         """
         try:
-            # First stop any previous advertising to avoid conflicts.
-            self.ble.gap_advertise(None)
-            sleep(0.05)
+            if force_restart:
+                self.ble.gap_advertise(None)
             # Start advertising with our payload.
             self.ble.gap_advertise(interval_us, adv_data=self._payload)
-            print("BLEScale - Advertising started")
+            self._adv_retry = False
+            if _LOG: print("BLEScale - Advertising started")
         except OSError as e:
-            print("Failed to advertise:", e)
+            self._adv_retry = True
+            if _LOG: print("Failed to advertise:", e)
 
     # ─────────────────────────────────────────────────────────────────
     # RX: handling fused/GPS JSON from Android
     # ─────────────────────────────────────────────────────────────────
+    @micropython.native
     def save_received_data_1(self, attr_handle, raw_data):
         """
         Process and save received data (GPS and fused data).
         Data is expected as one or more JSON lines separated by '\n'.
 
-        - Accumulates raw bytes into rx_buffer.
-        - Splits by '\n'.
-        - For each full JSON line: decode + parse + update fused_rx_data / gps_rx_data.
+        - Scans only the new chunk for '\n' (no re-scan / re-split of old bytes).
+        - A line split across writes is stitched from rx_buffer.
+        - For each full JSON line: parse + update fused_rx_data / gps_rx_data.
+        - The unterminated tail is kept in rx_buffer for the next write.
         """
-        self.rx_buffer += raw_data
-
-        while b"\n" in self.rx_buffer:
-            try:
-                # Extract one JSON line (bytes) and leave the rest in rx_buffer.
-                json_bytes, self.rx_buffer = self.rx_buffer.split(b"\n", 1)
-                if not json_bytes:
-                    continue
-
-                json_str = json_bytes.decode()
-
-                # Parse into Python dict.
-                data = ujson.loads(json_str)
-
-                # Fused location data update.
-                if attr_handle == self.fused_rx_handle:
-                    if "latitude" in data:
-                        self.fused_rx_data["latitude"] = data["latitude"]
-                    if "longitude" in data:
-                        self.fused_rx_data["longitude"] = data["longitude"]
-                    if "altitude" in data:
-                        self.fused_rx_data["altitude"] = data["altitude"]
-                    if "speed" in data:
-                        self.fused_rx_data["speed"] = data["speed"]
-                    if "time" in data:
-                        self.fused_rx_data["time"] = data["time"]
-                    if "accuracy" in data:
-                        self.fused_rx_data["accuracy"] = data["accuracy"]
-
-                # GPS location data update.
-                elif attr_handle == self.gps_rx_handle:
-                    if "latitude" in data:
-                        self.gps_rx_data["latitude"] = data["latitude"]
-                    if "longitude" in data:
-                        self.gps_rx_data["longitude"] = data["longitude"]
-                    if "altitude" in data:
-                        self.gps_rx_data["altitude"] = data["altitude"]
-                    if "speed" in data:
-                        self.gps_rx_data["speed"] = data["speed"]
-                    if "time" in data:
-                        self.gps_rx_data["time"] = data["time"]
-                    if "accuracy" in data:
-                        self.gps_rx_data["accuracy"] = data["accuracy"]
-
-            except Exception as e:
-                print("Failed to parse data:", e)
+        if attr_handle == self.fused_rx_handle:
+            target = self.fused_rx_data
+        elif attr_handle == self.gps_rx_handle:
+            target = self.gps_rx_data
+        else:
+            return
 
-    def save_received_data(self, attr_handle, raw_data):
-        """
-        Alternative debug version of the parser (kept from original).
-        Not used in the main flow, but left here for debugging if needed.
-        """
-        self.rx_buffer += raw_data
+        find = raw_data.find
+        start = 0
+        nl = find(b"\n")
+        while nl >= 0:
+            buf = self.rx_buffer
+            if buf:
+                buf.extend(memoryview(raw_data)[start:nl])
+                json_bytes = bytes(buf)
+                self.rx_buffer = bytearray()
+            else:
+                json_bytes = raw_data[start:nl]
+            start = nl + 1
+            nl = find(b"\n", start)
+            if not json_bytes:
+                continue
 
-        while b"\n" in self.rx_buffer:
             try:
-                json_bytes, self.rx_buffer = self.rx_buffer.split(b"\n", 1)
-                print("Raw JSON bytes:", json_bytes)
-                json_str = json_bytes.decode()
-                data = ujson.loads(json_str)
-                print("json str data:", json_str)
-
-                if "latitude" in data:
-                    print("Latitude (after decoding):", data["latitude"])
-                if "longitude" in data:
-                    print("Longitude (after decoding):", data["longitude"])
+                # Fused / GPS location data update (known keys only).
+                _parse_geo(json_bytes, target)
+            except ValueError:
+                try:
+                    # Unexpected layout: fall back to the full JSON parser.
+                    data = ujson.loads(json_bytes)
+                    # Plain loop: the native emitter does not support generators.
+                    # Numbers only (null / strings would break the %d / %f TX
+                    # templates), converted like the scanner does.
+                    for _, k, conv in _GEO_FIELDS:
+                        v = data.get(k)
+                        if isinstance(v, (int, float)):
+                            target[k] = conv(v)
+                except Exception as e:
+                    if _LOG: print("Failed to parse data:", e)
             except Exception as e:
-                print("Failed to parse data:", e)
+                if _LOG: print("Failed to parse data:", e)
 
-    # Legacy parser – NOT used now, kept only as reference
-    def ingest_rx(self, attr, raw):
-        """
-        Old RX parser (not used in the current flow).
-        WARNING: References to __fused/__gps were removed from the state.
-        Left here only as a historical reference – do not call.
-        """
-        try:
-            self.rx_buffer += raw
-            while b"\n" in self.rx_buffer:
-                js, self.rx_buffer = self.rx_buffer.split(b"\n", 1)
-                if not js:
-                    continue
-                _ = ujson.loads(js.decode())
-        except Exception as e:
-            print("RX parse error:", e)
+        if start < len(raw_data):
+            self.rx_buffer.extend(memoryview(raw_data)[start:])
 
     # ─────────────────────────────────────────────────────────────────
     # TX: JSON response for weight / fused / gps
     # ─────────────────────────────────────────────────────────────────
+    @micropython.native
     def send_tx_as_json_response(self, attr_handle):
         """
         Build and send JSON response over a TX characteristic.
@@ -310,52 +369,46 @@ class BLEScale:
           "accuracy": ...,
           "idle": true|false    # <— allows Android to switch power profile
         }
+        The weight handle only sends "from", "weight" and "idle".
         """
-        # Base payload: always include weight and idle flag.
-        self.tx_data = {
-            "from": "",
-            "weight": self.weight_tx,  # kilograms for the app
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-            "idle": self.pm.idle,
-        }
-
-        # Decide which data block to fill based on the requested handle.
-        if attr_handle == self.weight_tx_handle:
-            self.tx_data["from"] = "weight"
+        # Build inside the try as well: this runs in the BLE IRQ
+        try:
+            # Decide which payload to build based on the requested handle.
+            if attr_handle == self.weight_tx_handle:
+                payload = self._build_weight_tx()
 
-        elif attr_handle == self.fused_tx_handle:
-            self.tx_data.update(self.fused_rx_data)
-            self.tx_data["from"] = "fused"
-            print("sending fused_rx_data :", self.tx_data, "\n")
+            elif attr_handle == self.fused_tx_handle:
+                payload = self._build_fused_tx()
 
-        elif attr_handle == self.gps_tx_handle:
-            self.tx_data.update(self.gps_rx_data)
-            self.tx_data["from"] = "gps"
-            print("sending gps_rx_data :", self.tx_data, "\n")
+            elif attr_handle == self.gps_tx_handle:
+                payload = self._build_gps_tx()
 
-        else:
-            print("Unknown TX handle:", attr_handle)
-            return
+            else:
+                if _LOG: print("Unknown TX handle:", attr_handle)
+                return
 
-        try:
-            self.ble.gatts_write(attr_handle, ujson.dumps(self.tx_data).encode())
+            self.tx_data = payload
+            self.ble.gatts_write(attr_handle, payload)
         except Exception as e:
-            print("Failed to send response:", e)
+            if _LOG: print("Failed to send response:", e)
 
-    def reply_tx_1(self, attr):
-        """
-        Backward-compatible TX handler used by the READ IRQ.
+    # Per-handle builders: same JSON as before, but straight to bytes
+    def _build_weight_tx(self):
+        return (_TX_WEIGHT_PFX + (b"%.3f" % self.weight_tx)
+                + (_TX_IDLE_T if self.pm.idle else _TX_IDLE_F))
+
+    def _build_fused_tx(self):
+        return self._build_geo_tx(_TX_FUSED_FMT, self.fused_rx_data)
+
+    def _build_gps_tx(self):
+        return self._build_geo_tx(_TX_GPS_FMT, self.gps_rx_data)
+
+    def _build_geo_tx(self, fmt, d):
+        # One C-level format call for the fixed 7-field schema; idle appended as a literal
+        return (fmt % (self.weight_tx, d["time"], d["latitude"], d["longitude"],
+                       d["speed"], d["altitude"], d["accuracy"])
+                + (_TX_IDLE_T if self.pm.idle else _TX_IDLE_F))
 
-        Simply delegates to send_tx_as_json_response(), so all JSON
-        formatting lives in a single place.
-        """
-        self.send_tx_as_json_response(attr)
-        
     def reply_tx(self, attr):
         """
         TX handler used by the READ IRQ.
@@ -364,8 +417,8 @@ class BLEScale:
         - Take a fresh weight reading before sending.
         - This makes the scale work even if run() is never called.
         """
-        # 1. Update weight_tx with a fresh measurement
-        self.check_scale()
+        # 1. Update weight_tx with a fresh measurement (get_weight keeps it in sync)
+        self.get_weight()
 
         # 2. Build and send the JSON response
         self.send_tx_as_json_response(attr)
@@ -398,35 +451,6 @@ class BLEScale:
     # ─────────────────────────────────────────────────────────────────
     # Weight reading + power-optimized HX711 usage via LowPowerScale
     # ─────────────────────────────────────────────────────────────────
-    def get_weight_1(self):
-        """
-        Read weight using LowPowerScale.
-
-        Internally:
-        - LowPowerScale always works in grams (HX711 calibrated accordingly).
-        - PowerManager.update_with_weight() is called inside LowPowerScale.
-        - HX711 is powered down when idle (inside LowPowerScale low-power mode).
-
-        Externally:
-        - This method returns kilograms (for LEDs / JSON to phone).
-        """
-        try:
-            if self.pm.idle:
-                weight_g = self.scale.read_weight_low_power(
-                    times=1,
-                    idle_sleep_ms=0,  # no internal sleep; run() controls loop timing
-                )
-            else:
-                weight_g = self.scale.read_weight_normal(times=3)
-
-            self.last_weight_g = weight_g
-            #weight_kg = weight_g / 1000.0
-            weight_kg = self.last_weight_g / 1000.0
-            return weight_kg
-
-        except Exception as e:
-            print("HX711 error:", e)
-            return 0.0
     def get_weight(self):
         """
         Read weight using LowPowerScale.
@@ -439,18 +463,26 @@ class BLEScale:
         Externally:
         - Returns kilograms.
         - Also keeps weight_tx in sync.
+        - While idle, returns the cached weight_tx if the last read is < 200 ms old
+          (a READ right after run()'s sample does not clock the HX711 again).
+        - While active, only (re)starts the non-blocking sampler and returns
+          the last completed weight; weight_tx updates when the sampler finishes.
         """
+        now = ticks_ms()
+        if not self.pm.idle:
+            self.start_sampling()
+            return self.weight_tx
+        if self._sampling or ticks_diff(now, self._last_sample_ms) < _SAMPLE_CACHE_MS:
+            return self.weight_tx
         try:
-            if self.pm.idle:
-                weight_g = self.scale.read_weight_low_power(
-                    times=1,
-                    idle_sleep_ms=0,  # no internal sleep; run() controls loop timing
-                )
-            else:
-                weight_g = self.scale.read_weight_normal(times=3)
+            weight_g = self.scale.read_weight_low_power(
+                times=1,
+                idle_sleep_ms=0,  # no internal sleep; run() controls loop timing
+            )
 
             self.last_weight_g = weight_g
             weight_kg = weight_g / 1000.0
+            self._last_sample_ms = ticks_ms()
 
             # Keep the TX field always up to date
             self.weight_tx = weight_kg
@@ -458,46 +490,47 @@ class BLEScale:
             return weight_kg
 
         except Exception as e:
-            print("HX711 error:", e)
+            if _LOG: print("HX711 error:", e)
             self.weight_tx = 0.0
             return 0.0
 
-
-    #working fine - method for testing 
-    def get_weight_for_testing(self):
+    def start_sampling(self):
         """
-        Minimal version that behaves like the working test loop:
-        - Always use read_weight_low_power(times=1, idle_sleep_ms=0)
-        - Return kilograms
-        - Keep weight_tx in sync
+        Start a non-blocking average of _ACTIVE_SAMPLES HX711 conversions.
+        No-op while one is in flight (unless it has been stuck for too long).
         """
-        try:
-            # Use the same logic as your test: always low-power read, no branch on pm.idle
-            weight_g = self.scale.read_weight_low_power(
-                times=1,
-                idle_sleep_ms=0
-            )
-
-            self.last_weight_g = weight_g
-            weight_kg = weight_g / 1000.0
-
-            self.weight_tx = weight_kg
-            return weight_kg
+        now = ticks_ms()
+        if self._sampling and ticks_diff(now, self._sample_t0) < _SAMPLE_TIMEOUT_MS:
+            return
+        self._sampling = True
+        self._sample_t0 = now
+        self.scale.start_sample(_ACTIVE_SAMPLES)
+        self.poll_sampling()
 
+    def poll_sampling(self):
+        # Collect whatever conversions are ready; finish once enough are averaged
+        try:
+            weight_g = self.scale.poll_sample()
         except Exception as e:
-            print("HX711 error:", e)
-            self.weight_tx = 0.0
-            return 0.0
+            if _LOG: print("HX711 error:", e)
+            self._sampling = False
+            return
+        if weight_g is None:
+            return
+
+        self._sampling = False
+        self.last_weight_g = weight_g
+        self.weight_tx = weight_g / 1000.0
+        self._last_sample_ms = ticks_ms()
 
     def check_scale(self):
         """
         Periodic call from main loop:
-        - Reads weight (in kg) using get_weight().
-        - Keeps weight_tx updated (so TX JSON always has fresh weight).
+        - Reads weight (in kg) using get_weight(), which also updates weight_tx
+          (so TX JSON always has fresh weight).
         - Uses LEDs to signal basic weight state.
         """
-        weight_kg = self.get_weight()
-        self.weight_tx = weight_kg
+        self.get_weight()
 
         # Example visual logic can be added here if you want to use LED colours
         # based on weight threshold, etc.
@@ -510,26 +543,12 @@ class BLEScale:
         Reset received fused/GPS data and TX buffer.
         Called on BLE disconnect.
         """
-        self.fused_rx_data = {
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
-        self.gps_rx_data = {
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
-        self.tx_data = {}
-        self.rx_buffer = b""
+        self.fused_rx_data.update(_GEO_ZERO)
+        self.gps_rx_data.update(_GEO_ZERO)
+        self.tx_data = b""
+        self.rx_buffer = bytearray()
 
-        print("RX and TX data reset")
+        if _LOG: print("RX and TX data reset")
 
     # ─────────────────────────────────────────────────────────────────
     # Main loop – dynamic sleep based on PowerManager state
@@ -546,24 +565,58 @@ class BLEScale:
               * Recent data transfer→ green blinking
               * Error window        → red blinking
 
-        - Adapts loop sleep duration based on idle/active state.
+        - Each job has its own ticks_ms() deadline: the weight period adapts to
+          idle/active state, the LED animation keeps its own (faster) period.
+        - Waits until the nearest deadline; a BLE event wakes the loop early.
         """
+        next_weight = next_led = ticks_ms()
         while True:
-            # 1. Read latest weight and update power manager.
-            self.check_scale()
+            now = ticks_ms()
 
-            # 2. Let the LED manager update its animation.
-            self.leds.update()
+            # 0. Retry advertising that failed to start from the IRQ path.
+            if self._adv_retry and not self.connected:
+                self.advertise(force_restart=True)
 
-            # 3. Decide sleep time based on power state.
-            if self.pm.should_enter_deep_idle():
-                base_sleep = 5.0   # seconds – deep idle
-            elif self.pm.idle:
-                base_sleep = 2.0   # seconds – idle but not long enough
-            else:
-                base_sleep = 0.5   # seconds – active load, faster updates
+            # 1. Read latest weight and update power manager (an active-mode
+            #    average in flight picks up its ready samples first).
+            if self._sampling:
+                self.poll_sampling()
+            if ticks_diff(now, next_weight) >= 0:
+                self.check_scale()
+                next_weight = ticks_add(now, self.weight_period_ms())
 
-            sleep(base_sleep)
+            # 2. Let the LED manager update its animation.
+            if ticks_diff(now, next_led) >= 0:
+                self.leds.update(now)
+                next_led = ticks_add(now, _LED_PERIOD_MS)
+
+            # 3. Sleep until the nearest deadline (or the next BLE event).
+            now = ticks_ms()
+            timeout = min(ticks_diff(next_weight, now), ticks_diff(next_led, now))
+            if timeout > 0:
+                self.wait_for_event(timeout)
+
+    def weight_period_ms(self):
+        """Weight sampling period based on power state."""
+        if self.pm.should_enter_deep_idle():
+            return _DEEP_PERIOD_MS
+        if self.pm.idle:
+            return _IDLE_PERIOD_MS
+        return _WEIGHT_PERIOD_MS
+
+    def wait_for_event(self, timeout_ms):
+        """
+        Sleep up to timeout_ms, returning early once an IRQ handler sets _wake
+        or, while sampling, once the HX711 has a conversion ready.
+        """
+        deadline = ticks_add(ticks_ms(), timeout_ms)
+        ready = self.hx.is_ready
+        while not self._wake and not (self._sampling and ready()):
+            left = ticks_diff(deadline, ticks_ms())
+            if left <= 0:
+                break
+            sleep_ms(left if left < _WAKE_POLL_MS else _WAKE_POLL_MS)
+        self._wake = False
 
 
 if __name__ == "__main__":
@@ -7,18 +7,14 @@
 # Behavior : Non-blocking loop (LED animation + weight read + power manager)
 # =============================================================================
 
-#from time import sleep
-#from time import ticks_ms, ticks_diff
-#from micropython import const
-#from bluetooth import BLE
-#import ujson
-
-from time import sleep, ticks_ms, ticks_diff
+from time import sleep
 from machine import Pin
-from micropython import const
+import micropython
+from micropython import const, schedule
 import bluetooth
 import struct
 import ujson
+import uasyncio
 from bluetooth import BLE
 
 from lib.sensors.hx711_driver import HX711
@@ -26,23 +22,199 @@ from payload import advertising_payload
 from lib.common_const import *
 import s3_const as CFG
 
-from gatt_defs import WEIGHT_SERVICE_UUID, WEIGHT_SERVICE, GATT_SCHEMA_VERSION
+from gatt_defs import WEIGHT_SERVICE_UUID, WEIGHT_SERVICE, GATT_SCHEMA_VERSION_BIN
 from power_manager import PowerManager
 from low_power_scale import LowPowerScale
 
-from lib.s3_neopixel_led_manager_v1_5_0 import S3RGBManager
-# from lib.common_const import (
-#     IRQ_CENTRAL_CONNECT,
-#     IRQ_CENTRAL_DISCONNECT,
-#     IRQ_GATTS_WRITE,
-#     IRQ_GATTS_READ_REQUEST,
-# )
+from lib.led_rgb_state import S3RGBManager
 
 IRQ_CENTRAL_CONNECT = const(1)
 IRQ_CENTRAL_DISCONNECT = const(2)
 IRQ_GATTS_WRITE = const(3)
 IRQ_GATTS_READ_REQUEST = const(4)
 
+# Runtime logging (IRQ / TX / RX / loop); 0 lets the compiler drop the prints
+_DEBUG = const(0)
+
+# LED animation step of the async loop
+_LED_PERIOD_MS = const(90)
+
+# Scale-task period per power state (ms)
+_SLEEP_IDLE_DEEP = const(5000)
+_SLEEP_IDLE = const(2000)
+_SLEEP_ACTIVE = const(500)
+
+# Advertising interval
+_ADV_INTERVAL_US = const(500_000)
+
+# HX711 data-ready wait: give up if DOUT never falls (powered down / unwired);
+# covers the ~400 ms first conversion after power_up at 10 SPS
+_DOUT_TIMEOUT_MS = const(600)
+
+# Requested ATT MTU: a full JSON line fits one PDU (Android must call
+# gatt.requestMtu(247) after connecting; until then the default 23 applies)
+_MTU = const(247)
+_MTU_DEFAULT = const(23)
+_ATT_HDR = const(3)
+
+# One global lookup instead of ujson + attribute on the TX fallback path
+_dumps = ujson.dumps
+
+# Weight TX characteristic layout (little-endian float kg + idle byte),
+# GATT schema 1.5.0 - see gatt_defs.py
+_WEIGHT_PACK_FMT = "<fB"
+_WEIGHT_PACK_LEN = const(5)
+
+# RX/TX field names, one module-level name each (shared by every table and
+# dict below, so per-line lookups hit the same interned key objects)
+_K_TIME = "time"
+_K_LAT = "latitude"
+_K_LON = "longitude"
+_K_ALT = "altitude"
+_K_SPEED = "speed"
+_K_ACC = "accuracy"
+# Fields copied from an RX JSON line into fused_rx_data / gps_rx_data
+_RX_FIELDS = (_K_TIME, _K_LAT, _K_LON, _K_ALT, _K_SPEED, _K_ACC)
+
+# Initial / reset contents of fused_rx_data and gps_rx_data (copied, never mutated)
+_RX_DEFAULT = {_K_TIME: 0, _K_LAT: 0.0, _K_LON: 0.0, _K_SPEED: 0.0, _K_ALT: 0.0, _K_ACC: 0.0}
+
+# Byte keys of an RX line -> interned _RX_FIELDS names
+_RX_KEYS = {
+    b"time": _K_TIME,
+    b"latitude": _K_LAT,
+    b"longitude": _K_LON,
+    b"altitude": _K_ALT,
+    b"speed": _K_SPEED,
+    b"accuracy": _K_ACC,
+}
+
+
+def _num(b):
+    # JSON number bytes (quoted or bare) -> int / float; text kept as str
+    try:
+        if b"." in b or b"e" in b or b"E" in b:
+            return float(b)
+        return int(b)
+    except ValueError:
+        return b.decode()
+
+
+@micropython.native
+def _parse_flat_json(mv, target):
+    """
+    Copy the _RX_KEYS fields of one flat JSON object (memoryview over
+    b'{"k":v,...}') into target as native int / float, in a single pass and
+    without building a dict. Unknown keys, quoted or not, are skipped. Returns the
+    number of fields written.
+    """
+    n = len(mv)
+    i = 0
+    got = 0
+    while i < n:
+        # "key"
+        while i < n and mv[i] != 0x22:
+            i += 1
+        s = i + 1
+        i = s
+        while i < n and mv[i] != 0x22:
+            i += 1
+        if i >= n:
+            break
+        key = _RX_KEYS.get(bytes(mv[s:i]))
+        # ':' then the value, quoted or bare up to ',' / '}'
+        while i < n and mv[i] != 0x3A:
+            i += 1
+        i += 1
+        while i < n and mv[i] == 0x20:
+            i += 1
+        if i < n and mv[i] == 0x22:
+            i += 1
+            s = i
+            while i < n and mv[i] != 0x22:
+                i += 1
+            e = i
+        else:
+            s = i
+            while i < n and mv[i] != 0x2C and mv[i] != 0x7D:
+                i += 1
+            e = i
+        while i < n and mv[i] != 0x2C:
+            i += 1
+        i += 1
+        if key is not None and e > s:
+            v = bytes(mv[s:e]).strip()
+            if v != b"null":
+                target[key] = _num(v)
+                got += 1
+    return got
+
+
+# TX JSON keys, pre-encoded as b'"key":' for _json_into
+_TX_KEYS = ("from", "weight") + _RX_FIELDS + ("idle",)
+_TX_KEY_B = {k: ('"%s":' % k).encode() for k in _TX_KEYS}
+
+
+def _put(mv, n, b):
+    # copy b into mv at n, return the new end (ValueError when mv is full)
+    e = n + len(b)
+    if e > len(mv):
+        raise ValueError("TX buffer full")
+    mv[n:e] = b
+    return e
+
+
+def _json_into(buf, d):
+    """
+    Serialize the flat dict d (str / number / bool values) as JSON straight
+    into the bytearray buf, without the dumps() str + encode() copies.
+    Returns the payload length.
+    """
+    mv = memoryview(buf)
+    n = 0
+    sep = b"{"
+    for k, v in d.items():
+        n = _put(mv, n, sep)
+        sep = b","
+        kb = _TX_KEY_B.get(k)
+        n = _put(mv, n, kb if kb is not None else ('"%s":' % k).encode())
+        if v is True:
+            n = _put(mv, n, b"true")
+        elif v is False:
+            n = _put(mv, n, b"false")
+        elif v is None:
+            n = _put(mv, n, b"null")
+        elif isinstance(v, str):
+            n = _put(mv, n, b'"')
+            n = _put(mv, n, v.encode())
+            n = _put(mv, n, b'"')
+        else:
+            n = _put(mv, n, str(v).encode())
+    return _put(mv, n, b"}")
+
+
+def _take_lines(buf, raw):
+    """
+    Append raw to the bytearray buf and return the complete '\n'-terminated
+    lines. Only the new bytes are scanned; the unterminated tail stays in buf
+    (grown in place, no re-copy of the whole buffer per write).
+    """
+    lines = []
+    start = 0
+    nl = raw.find(b"\n")
+    while nl >= 0:
+        if buf:
+            buf.extend(memoryview(raw)[start:nl])
+            lines.append(bytes(buf))
+            buf[:] = b""
+        else:
+            lines.append(raw[start:nl])
+        start = nl + 1
+        nl = raw.find(b"\n", start)
+    if start < len(raw):
+        buf.extend(memoryview(raw)[start:])
+    return lines
+
 
 class BLEScale:
     def __init__(self, name="ESP32S3"):
@@ -50,9 +222,6 @@ class BLEScale:
         # Last measured weight **in kilograms** sent to the phone
         self.weight_tx = 0.0
 
-        # Partial received data buffer for JSON lines
-        self.rx_buffer = b""
-
         # Last raw weight in grams (for debug if needed)
         self.last_weight_g = 0.0
 
@@ -66,47 +235,72 @@ class BLEScale:
     def _init_ble(self):
         self.ble = BLE()
         self.ble.active(True)
-        self.ble.config(mtu=100)
+        self.ble.config(mtu=_MTU)
+        # Bound once: the IRQ / TX paths skip the self.ble attribute lookups
+        self._gatts_read = self.ble.gatts_read
+        self._gatts_write = self.ble.gatts_write
+        self._gatts_notify = self.ble.gatts_notify
         self.ble.irq(self._irq)
 
     def _init_state(self):
         self._connections = set()
+        # Negotiated ATT MTU per connection (IRQ_MTU_EXCHANGED)
+        self._mtu = {}
         self.connected = False
 
-        # Last measured weight **in kilograms** sent to the phone
-        #self.weight_tx = 0.0
-
-        # Partial received data buffer for JSON lines
-        #self.rx_buffer = b""
-
-        # Last raw weight in grams (for debug if needed)
-        #self.last_weight_g = 0.0
+        # Per-handle RX buffers for _on_gatts_write (fused/gps never mix)
+        self._fused_buf = bytearray()
+        self._gps_buf = bytearray()
+        # (handle, bytes) written by the central, parsed outside the IRQ
+        self._rx_queue = []
+        self._drain_rx_ref = self._drain_rx
+        # Last serialized TX payload per handle (READ replies without ujson in the IRQ)
+        self._tx_cache = {}
+        # Set from the BLE IRQ (connect / disconnect / transfer) to wake the
+        # scale task early; ThreadSafeFlag, since Event.set() is not IRQ-safe
+        self._wake = uasyncio.ThreadSafeFlag()
 
         # RX data buffers for fused and GPS (received from Android)
-        self.fused_rx_data = {
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
-        self.gps_rx_data = {
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
+        self.fused_rx_data = dict(_RX_DEFAULT)
+        self.gps_rx_data = dict(_RX_DEFAULT)
         self.tx_data = {}
 
+        # Pre-built JSON TX payloads for fused/gps: only weight/idle and the
+        # geo block are patched per read
+        self._tx_fused = self._tx_template("fused")
+        self._tx_gps = self._tx_template("gps")
+        # Reused TX buffers, indexed by _tx_payload's irq flag: a READ built
+        # in _irq never shares one with notify_tx(), which a scheduled IRQ
+        # may interrupt mid-assembly. Weight TX is binary, not JSON:
+        # <f weight kg><B idle> packed in place
+        self._weight_pack = (bytearray(_WEIGHT_PACK_LEN), bytearray(_WEIGHT_PACK_LEN))
+        self._fused_tx_buf = (bytearray(_MTU), bytearray(_MTU))
+        self._gps_tx_buf = (bytearray(_MTU), bytearray(_MTU))
+
+    @staticmethod
+    def _tx_template(source):
+        return {
+            "from": source,
+            "weight": 0.0,
+            _K_TIME: 0,
+            _K_LAT: 0.0,
+            _K_LON: 0.0,
+            _K_SPEED: 0.0,
+            _K_ALT: 0.0,
+            _K_ACC: 0.0,
+            "idle": False,
+        }
+
     def _init_sensors(self):
         self.hx = HX711(CFG.DT_PIN, CFG.SCK_PIN)
         self.hx.set_scale(2280)
         self.offset = 0
         self.hx.tare()
 
+        # DOUT falls when a conversion is ready: the driver's IRQ sets this
+        # flag, which wakes the scale task instead of read() busy-polling
+        self.hx.ready_flag = uasyncio.ThreadSafeFlag()
+
         # Power manager + LowPowerScale (grams internally)
         self.pm = PowerManager()
         self.scale = LowPowerScale(self.hx, self.pm)
@@ -131,7 +325,13 @@ class BLEScale:
                 self.gps_rx_handle,
             ),
         ) = self.ble.gatts_register_services((WEIGHT_SERVICE,))
-        print("BLE services registered (GATT schema = %s)" % GATT_SCHEMA_VERSION)
+        print("BLE services registered (GATT schema = %s)" % GATT_SCHEMA_VERSION_BIN)
+        # RX values up to one full-MTU write (default buffer is 20 bytes)
+        for h in (self.fused_rx_handle, self.gps_rx_handle):
+            try:
+                self.ble.gatts_set_buffer(h, _MTU - _ATT_HDR)
+            except (AttributeError, OSError) as e:
+                print("gatts_set_buffer failed:", e)
         self._payload = advertising_payload(name=name, services=[WEIGHT_SERVICE_UUID])
         self._advertise()
 
@@ -141,67 +341,56 @@ class BLEScale:
             self._on_connect(data)
         elif event == IRQ_CENTRAL_DISCONNECT:
             self._on_disconnect(data)
-        #elif event == IRQ_GATTS_WRITE:
-        #    self._on_write(data)
-        #elif event == IRQ_GATTS_READ_REQUEST:
-        #    self._on_read(data)
         elif event == IRQ_GATTS_WRITE:
             # Data written by central to one of the RX characteristics.
             conn_handle, char_handle = data
-            raw_data = self.ble.gatts_read(char_handle)
-            # Parse JSON line(s) and update fused_rx_data / gps_rx_data.
-            #self.save_received_data_1(char_handle, raw_data)
-            self.save_received_data(char_handle, raw_data)
+            raw_data = self._gatts_read(char_handle)
+            # Queue only; JSON parsing runs in _drain_rx (scheduled, not in the IRQ).
+            self._rx_queue.append((char_handle, bytes(raw_data)))
+            try:
+                schedule(self._drain_rx_ref, None)
+            except RuntimeError:
+                pass  # schedule queue full; run() drains on its next pass
             self.leds.on_transfer()  # -> GREEN blink window
+            self._wake.set()
 
         elif event == IRQ_GATTS_READ_REQUEST:
             # Central reads one of our TX characteristics.
             conn_handle, char_handle = data
-            self.send_tx_as_json_response(char_handle)
-            print("onread")
+            payload = self._tx_cache.get(char_handle)
+            if payload is not None:
+                self._gatts_write(char_handle, payload)
+            else:
+                # Nothing built yet (read before the first loop pass)
+                self.send_tx_as_json_response(char_handle)
             self.leds.on_transfer()  # -> GREEN blink window
 
+        elif event == IRQ_MTU_EXCHANGED:
+            conn_handle, mtu = data
+            self._mtu[conn_handle] = mtu
+            if _DEBUG: print("MTU exchanged:", mtu)
+
     def _on_connect(self, data):
         conn_handle, _, _ = data
         self._connections.add(conn_handle)
         self.connected = True
         self.leds.on_connect()  # -> BLUE solid handling
-        print("New connection:", conn_handle)
+        self._wake.set()
+        if _DEBUG: print("New connection:", conn_handle)
 
     def _on_disconnect(self, data):
         conn_handle, _, _ = data
         self._connections.discard(conn_handle)
+        self._mtu.pop(conn_handle, None)
         self.connected = False
         self.leds.on_disconnect()  # -> BLUE blink (via update)
+        self._wake.set()
         self._advertise()
-        print("Disconnected:", conn_handle)
+        if _DEBUG: print("Disconnected:", conn_handle)
         self.clear()
 
-    def _on_write(self, data):
-        _conn, char_handle = data
-        #raw = self.ble.gatts_read(char_handle)
-        #self._ingest_rx(char_handle, raw)
-        
-    
-        raw_data = self.ble.gatts_read(char_handle)
-        # Parse JSON line(s) and update fused_rx_data / gps_rx_data.
-        self.save_received_data_1(char_handle, raw_data)
-        #self.save_received_data(char_handle, raw_data)
-        self.leds.on_transfer()  # -> GREEN blink window
-        # (weight is always read in run loop)
-
-    def _on_read(self, data):
-        conn_handle, char_handle = data
-        #_conn, h = data
-        #//self._reply_tx(h)
-        
-        #conn_handle, char_handle = data
-        #self.toggle_led(self.led_green)
-        self.send_tx_as_json_response(char_handle)
-        self.leds.on_transfer()  # -> GREEN blink window
-
     # ---- Advertising ---------------------------------------------------------
-    def _advertise(self, interval_us=500000):
+    def _advertise(self, interval_us=_ADV_INTERVAL_US):
         """
         Start BLE advertising so the device can be discovered.
         Called on startup and on disconnect.
@@ -210,9 +399,9 @@ class BLEScale:
             self.ble.gap_advertise(None)
             sleep(0.05)
             self.ble.gap_advertise(interval_us, adv_data=self._payload)
-            print("BLEScale - Advertising started")
+            if _DEBUG: print("BLEScale - Advertising started")
         except OSError as e:
-            print("Failed to advertise:", e)
+            if _DEBUG: print("Failed to advertise:", e)
 
     # ─────────────────────────────────────────────────────────────────
     # LED helpers
@@ -233,147 +422,46 @@ class BLEScale:
     # ─────────────────────────────────────────────────────────────────
     # Weight reading + power-optimized HX711 usage via LowPowerScale
     # ─────────────────────────────────────────────────────────────────
-    def get_weight(self):
+    async def get_weight(self):
+        """
+        LowPowerScale modes (idle: 1 sample then power_down, active: 3
+        samples), awaiting the data-ready IRQ instead of polling and
+        instead of a fixed settle delay after power_up.
+        """
         try:
-            if self.pm.idle:
-                weight_g = self.scale.read_weight_low_power(
-                    times=1,
-                    idle_sleep_ms=0,  # loop controls sleep
-                )
-            else:
-                weight_g = self.scale.read_weight_normal(times=3)
-
+            weight_g = await self.scale.read_weight_async(_DOUT_TIMEOUT_MS)
             self.last_weight_g = weight_g
             weight_kg = weight_g / 1000.0
             return weight_kg
         except Exception as e:
-            print("HX711 error:", e)
+            if _DEBUG: print("HX711 error:", e)
             return 0.0
 
-    def check_scale(self):
-        weight_kg = self.get_weight()
+    async def check_scale(self):
+        weight_kg = await self.get_weight()
         self.weight_tx = weight_kg
 
     # ─────────────────────────────────────────────────────────────────
     # Reset RX/TX state (on disconnect)
     # ─────────────────────────────────────────────────────────────────
     def clear(self):
-        self.fused_rx_data = {
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
-        self.gps_rx_data = {
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
+        self.fused_rx_data = dict(_RX_DEFAULT)
+        self.gps_rx_data = dict(_RX_DEFAULT)
         self.tx_data = {}
-        print("RX and TX data reset")
-
-    # ---- RX/TX JSON (simple version) -----------------------------------------
-    def _ingest_rx(self, attr, raw):
-        """
-        Robust JSON-line parser for fused / gps RX.
-
-        Expected format from Android:
-            b'{"time":..., "latitude":..., ...}\\n'
-
-        This function:
-        - Accumulates bytes in self.rx_buffer
-        - Splits on '\n'
-        - Strips spaces and '\r'
-        - Tries to decode + parse JSON
-        - On error: prints debug info but does NOT crash
-        """
-        # 1) Accumulate raw bytes (may be partial)
-        self.rx_buffer += raw
-
-        while True:
-            nl = self.rx_buffer.find(b"\n")
-            if nl == -1:
-                # No full line yet – wait for more data
-                break
-
-            # 2) Extract one line and keep the rest in buffer
-            js_bytes = self.rx_buffer[:nl]
-            self.rx_buffer = self.rx_buffer[nl + 1:]
-
-            # 3) Strip whitespace / CR
-            js_bytes = js_bytes.strip()
-            if not js_bytes:
-                # Empty line – ignore
-                continue
-
-            # 4) Decode to text
-            try:
-                js_str = js_bytes.decode()
-            except UnicodeError as e:
-                print("RX decode error:", e, "raw bytes:", js_bytes)
-                continue
+        self._tx_cache = {}
+        if _DEBUG: print("RX and TX data reset")
 
-            # Remove trailing '\r' just in case it's CRLF
-            if js_str.endswith("\r"):
-                js_str = js_str[:-1]
-
-            # 5) Try parse JSON
-            try:
-                d = ujson.loads(js_str)
-            except Exception as e:
-                print("RX parse error:", e, "raw JSON string:", js_str)
-                # optional: continue waiting for next line
-                continue
-
-            # 6) Route to fused/gps
-            if attr == self.fused_rx_handle:
-                self.fused_rx_data.update(d)
-                # print("fused_rx_data updated:", self.fused_rx_data)
-            elif attr == self.gps_rx_handle:
-                self.gps_rx_data.update(d)
-                # print("gps_rx_data updated:", self.gps_rx_data)
-            else:
-                # Unknown handle (shouldn't happen)
-                print("RX on unknown handle:", attr, "data:", d)
-
-
-    def _reply_tx(self, attr):
-        tx = {
-            "from": "",
-            "weight": self.weight_tx,
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
-        if attr == self.weight_tx_handle:
-            tx["from"] = "weight"
-        elif attr == self.fused_tx_handle:
-            tx.update(self.fused_rx_data)
-            tx["from"] = "fused"
-        elif attr == self.gps_tx_handle:
-            tx.update(self.gps_rx_data)
-            tx["from"] = "gps"
-        else:
-            return
-
-        try:
-            self.ble.gatts_write(attr, ujson.dumps(tx).encode())
-        except Exception as e:
-            print("TX write error:", e)
-            
-    
     # ─────────────────────────────────────────────────────────────────
     # RX: handling fused/GPS JSON from Android
     # ─────────────────────────────────────────────────────────────────
-    def save_received_data_1(self, attr_handle, raw_data):
+    def _drain_rx(self, _):
+        """Parse the RX writes queued by _irq (scheduled, outside IRQ context)."""
+        q = self._rx_queue
+        while q:
+            attr, raw = q.pop(0)
+            self._on_gatts_write(attr, raw)
+
+    def _on_gatts_write(self, attr_handle, raw_data):
         """
         STRICT, per-characteristic JSON-line parser.
 
@@ -383,150 +471,45 @@ class BLEScale:
         - Silently ignores partial / corrupt fragments.
         """
 
-        # Lazy-init per-handle buffers dict
-        if not hasattr(self, "_rx_buffers"):
-            self._rx_buffers = {}
-
-        # Get current buffer for this handle, append new raw bytes
-        buf = self._rx_buffers.get(attr_handle, b"") + raw_data
-
-        # Process all complete lines
-        while True:
-            nl = buf.find(b"\n")
-            if nl == -1:
-                # No full line yet – keep partial in buffer
-                break
+        # Buffer and target dict for this handle (bytearray, grown in place)
+        if attr_handle == self.fused_rx_handle:
+            buf = self._fused_buf
+            target = self.fused_rx_data
+        elif attr_handle == self.gps_rx_handle:
+            buf = self._gps_buf
+            target = self.gps_rx_data
+        else:
+            return
 
-            line = buf[:nl].strip()
-            buf = buf[nl + 1:]  # rest stays for next round
+        # Process all complete lines; partial tail stays in buf
+        for line in _take_lines(buf, raw_data):
+            line = line.strip()
 
             if not line:
                 # Empty line – skip
                 continue
 
-            # Decode bytes → string
-            try:
-                json_str = line.decode()
-            except Exception:
-                # Bad encoding – drop this line and keep going
-                continue
-
             # Must look like a full JSON object
-            if not (json_str.startswith("{") and json_str.endswith("}")):
+            if line[0] != 0x7B or line[-1] != 0x7D:
                 # Just ignore fragments like '41"}' or '...accuracy":"7.8}'
                 continue
 
-            # Parse JSON
+            # ------ Valid JSON here: fields go straight into the right dict ------
             try:
-                data = ujson.loads(json_str)
+                _parse_flat_json(memoryview(line), target)
             except Exception:
-                # Corrupted JSON – ignore this line
+                # Bad encoding / corrupted JSON – ignore this line
                 continue
 
-            # ------ Valid JSON here: update the right dict ------
-            if attr_handle == self.fused_rx_handle:
-                if "latitude" in data:
-                    self.fused_rx_data["latitude"] = str(data["latitude"])
-                if "longitude" in data:
-                    self.fused_rx_data["longitude"] = str(data["longitude"])
-                if "altitude" in data:
-                    self.fused_rx_data["altitude"] = str(data["altitude"])
-                if "speed" in data:
-                    self.fused_rx_data["speed"] = str(data["speed"])
-                if "time" in data:
-                    self.fused_rx_data["time"] = str(data["time"])
-                if "accuracy" in data:
-                    self.fused_rx_data["accuracy"] = str(data["accuracy"])
-
-            elif attr_handle == self.gps_rx_handle:
-                if "latitude" in data:
-                    self.gps_rx_data["latitude"] = str(data["latitude"])
-                if "longitude" in data:
-                    self.gps_rx_data["longitude"] = str(data["longitude"])
-                if "altitude" in data:
-                    self.gps_rx_data["altitude"] = str(data["altitude"])
-                if "speed" in data:
-                    self.gps_rx_data["speed"] = str(data["speed"])
-                if "time" in data:
-                    self.gps_rx_data["time"] = str(data["time"])
-                if "accuracy" in data:
-                    self.gps_rx_data["accuracy"] = str(data["accuracy"])
-
-        # Save leftover partial bytes for this handle
-        self._rx_buffers[attr_handle] = buf
-
-
-
-    def save_received_data(self, attr_handle, raw_data):
-        """
-        Alternative debug version of the parser (kept from original).
-        Prints raw JSON bytes and decoded string for debugging.
-        """
-        self.rx_buffer += raw_data
-
-        while b"\n" in self.rx_buffer:
-            try:
-                json_bytes, self.rx_buffer = self.rx_buffer.split(b"\n", 1)
-                json_bytes = json_bytes.strip()
-                if not json_bytes:
-                    continue
-
-                print("Raw JSON bytes:", json_bytes)
-
-                # Decode
-                try:
-                    json_str = json_bytes.decode()
-                except UnicodeError as e:
-                    print("RX decode error:", e)
-                    continue
-
-                print("json str data:", json_str)
-
-                # Ignore obvious fragments that are not a full JSON object
-                if not (json_str.startswith("{") and json_str.endswith("}")):
-                    print("RX fragment ignored (not full JSON):", json_str)
-                    continue
-
-                # Parse JSON
-                try:
-                    data = ujson.loads(json_str)
-                except Exception as e:
-                    print("Failed to parse data:", e, "raw JSON:", json_str)
-                    continue
-
-                # Extra debug: show parsed latitude/longitude if exist
-                if "latitude" in data:
-                    print("Latitude (after decoding):", data["latitude"])
-                if "longitude" in data:
-                    print("Longitude (after decoding):", data["longitude"])
-
-                # If we want to round here (optional)
-                if "latitude" in data:
-                    data["latitude"] = round(float(data["latitude"]), 7)
-                if "longitude" in data:
-                    data["longitude"] = round(float(data["longitude"]), 7)
-
-                # Correct: update dict with dict, NOT with json_str
-                if attr_handle == self.fused_rx_handle:
-                    print("fused(fusedRx):", json_str, "\n")
-                    self.fused_rx_data.update(data)
-
-                elif attr_handle == self.gps_rx_handle:
-                    print("gps(gpsRx):", json_str, "\n")
-                    self.gps_rx_data.update(data)
-
-            except Exception as e:
-                print("save_received_data (debug) unexpected error:", e)
-
-
     # ─────────────────────────────────────────────────────────────────
     # TX: JSON response for weight / fused / gps
     # ─────────────────────────────────────────────────────────────────
     def send_tx_as_json_response(self, attr_handle):
         """
-        Build and send JSON response over a TX characteristic.
+        Build and send the response over a TX characteristic.
 
-        Format (example):
+        weight: 5 bytes, struct "<fB" = (weight kg, idle 0/1).
+        fused / gps: JSON (schema still evolving), for example:
         {
           "from": "weight" | "fused" | "gps",
           "weight": <kg>,
@@ -539,84 +522,142 @@ class BLEScale:
           "idle": true|false    # <— allows Android to switch power profile
         }
         """
-        # Base payload: always include weight and idle flag.
-        self.tx_data = {
-            "from": "",
-            "weight": self.weight_tx,  # kilograms for the app
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-            "idle": self.pm.idle,
-        }
+        payload = self._tx_payload(attr_handle, 1)
+        if payload is None:
+            if _DEBUG: print("Unknown TX handle:", attr_handle)
+            return
 
-        # Decide which data block to fill based on the requested handle.
-        if attr_handle == self.weight_tx_handle:
-            self.tx_data["from"] = "weight"
+        try:
+            self._gatts_write(attr_handle, payload)
+        except Exception as e:
+            if _DEBUG: print("Failed to send response:", e)
 
-        elif attr_handle == self.fused_tx_handle:
-            self.tx_data.update(self.fused_rx_data)
-            self.tx_data["from"] = "fused"
-            print("sending fused_rx_data :", self.tx_data, "\n")
+    def _tx_payload(self, attr_handle, irq=0):
+        """
+        TX bytes for one handle (None for an unknown handle), a view of the
+        loop (irq=0) or IRQ (irq=1) buffer: valid until the next build.
+        """
+        # Weight: fixed binary struct, no dict / JSON round trip.
+        if attr_handle == self.weight_tx_handle:
+            buf = self._weight_pack[irq]
+            struct.pack_into(_WEIGHT_PACK_FMT, buf, 0,
+                             self.weight_tx, 1 if self.pm.idle else 0)
+            return buf
+
+        # Pick the pre-built payload for the requested handle.
+        if attr_handle == self.fused_tx_handle:
+            d = self._tx_fused
+            buf = self._fused_tx_buf[irq]
+            d.update(self.fused_rx_data)
+            if _DEBUG: print("sending fused_rx_data :", d, "\n")
 
         elif attr_handle == self.gps_tx_handle:
-            self.tx_data.update(self.gps_rx_data)
-            self.tx_data["from"] = "gps"
-            print("sending gps_rx_data :", self.tx_data, "\n")
+            d = self._tx_gps
+            buf = self._gps_tx_buf[irq]
+            d.update(self.gps_rx_data)
+            if _DEBUG: print("sending gps_rx_data :", d, "\n")
 
         else:
-            print("Unknown TX handle:", attr_handle)
-            return
+            return None
 
+        # Always include weight (kilograms for the app) and idle flag.
+        d["weight"] = self.weight_tx
+        d["idle"] = self.pm.idle
+        self.tx_data = d
         try:
-            self.ble.gatts_write(attr_handle, ujson.dumps(self.tx_data).encode())
-        except Exception as e:
-            print("Failed to send response:", e)
+            return memoryview(buf)[:_json_into(buf, d)]
+        except ValueError:
+            # Longer than one MTU (odd RX strings): allocate once instead
+            return _dumps(d).encode()
+
+    def notify_tx(self):
+        """
+        Push weight / fused / gps to every connected central (NOTIFY), built
+        once per loop pass instead of per READ request. READ stays as fallback
+        and is answered from _tx_cache, which holds a bytes snapshot: the
+        loop buffer is rewritten on the next pass, possibly under a READ.
+        """
+        conns = tuple(self._connections)
+        if not conns:
+            return
+        notify = self._gatts_notify
+        mtus = self._mtu
+        for h in (self.weight_tx_handle, self.fused_tx_handle, self.gps_tx_handle):
+            payload = bytes(self._tx_payload(h))
+            self._tx_cache[h] = payload
+            n = len(payload)
+            for conn in conns:
+                # A notify is capped at mtu-3; longer values stay READ-only
+                if n > mtus.get(conn, _MTU_DEFAULT) - _ATT_HDR:
+                    continue
+                try:
+                    notify(conn, h, payload)
+                except OSError as e:
+                    if _DEBUG: print("Notify failed:", e)
 
 
     # ─────────────────────────────────────────────────────────────────
     # Main loop – dynamic sleep based on PowerManager state
     # ─────────────────────────────────────────────────────────────────
     def run(self):
+        """Blocking entry point (main.py): runs run_async() on uasyncio."""
+        uasyncio.run(self.run_async())
+
+    async def run_async(self):
         """
-        Main loop:
+        Main loop as two tasks:
 
-        - Reads the scale (with power manager).
-        - Always calls leds.update():
+        - _scale_task: reads the scale (with power manager) and pushes TX,
+          then waits base_sleep_ms() or until a BLE event sets _wake.
+        - _led_task: calls leds.update() every _LED_PERIOD_MS:
 
             * Not connected  → BLUE blinking (toggle)
             * Connected      → BLUE solid
             * Transfer event → GREEN blinking for a short window
-
-        - Adapts sleep time based on idle/active state.
         """
+        uasyncio.create_task(self._led_task())
+        await self._scale_task()
+
+    def base_sleep_ms(self):
+        """Scale-task period (ms) for the current power state."""
+        if self.pm.should_enter_deep_idle():
+            return _SLEEP_IDLE_DEEP
+        if self.pm.idle:
+            return _SLEEP_IDLE
+        return _SLEEP_ACTIVE
+
+    async def _scale_task(self):
         while True:
+            # 0. Parse anything the IRQ queued but could not schedule
+            if self._rx_queue:
+                self._drain_rx(None)
+
             # 1. Read latest weight and update power manager (inside LowPowerScale)
-            self.check_scale()
+            await self.check_scale()
 
-            # 2. Advance LED state machine:
-            #    - blue blink until connected
-            #    - blue solid when connected
-            #    - green blink on transfer
-            self.leds.update()
+            # 1b. Push the fresh values to subscribed centrals
+            self.notify_tx()
 
-            # 3. Decide sleep time based on power state
-            if self.pm.should_enter_deep_idle():
-                base_sleep = 5.0
-            elif self.pm.idle:
-                base_sleep = 2.0
-            else:
-                base_sleep = 0.5
+            # 2. Sleep based on power state; a connect/disconnect/transfer
+            #    during a long idle sleep cuts it short. Stay in the event
+            #    loop rather than machine.lightsleep(): light sleep stalls
+            #    the BLE controller, so the scale would stop advertising.
+            try:
+                await uasyncio.wait_for_ms(self._wake.wait(), self.base_sleep_ms())
+            except uasyncio.TimeoutError:
+                pass
 
-            sleep(base_sleep)
+    async def _led_task(self):
+        # LED timing no longer depends on the (up to 5 s) scale period
+        while True:
+            self.leds.update()
+            await uasyncio.sleep_ms(_LED_PERIOD_MS)
 
 
 if __name__ == "__main__":
     scale = BLEScale()
     try:
-        scale.run()
+        uasyncio.run(scale.run_async())
     except KeyboardInterrupt:
         print("Stopping...")
     except Exception as e:
@@ -48,12 +48,12 @@ Changelog
     - Added "idle" field to BLE TX JSON payload.
 """
 
-from time import sleep, ticks_ms, ticks_diff
-from machine import Pin
+from time import sleep_ms, ticks_ms, ticks_diff
+from machine import Pin, Timer
+from array import array
+import micropython
 from micropython import const
 import bluetooth
-import struct
-import ujson
 from bluetooth import BLE
 
 # from v1.hx711 import HX711
@@ -68,6 +68,31 @@ from low_power_scale import LowPowerScale
 
 from lib.s3_neopixel_led_manager_v1_5_1 import S3RGBManager
 
+# Logging (IRQ, RX/TX, sampler, setup); 0 lets the compiler drop every print
+_DEBUG = const(0)
+
+# ATT MTU before / without an exchange, and the ATT header a notify carries
+_MTU_DEFAULT = const(23)
+_ATT_HDR = const(3)
+
+# HX711 sampler: hardware timer + ring of the last weights (grams, size 2**n).
+# While an average is in flight the timer ticks every _POLL_MS to collect
+# ready conversions; one stuck longer than _SAMPLE_TIMEOUT_MS is dropped
+_SAMPLE_TIMER_ID = const(0)
+_SAMPLE_MS = const(500)
+_POLL_MS = const(20)
+_SAMPLE_TIMEOUT_MS = const(1000)
+_W_RING_MASK = const(3)
+
+# Connection slots (the NimBLE default allows up to 4 centrals)
+_MAX_CONN = const(4)
+
+# Advertising interval
+_ADV_INTERVAL_US = const(500_000)
+
+# Shortest gap between two coalesced on_transfer() calls from run()
+_XFER_LED_MS = const(100)
+
 # IRQ constants for handling BLE events (MicroPython BLE)
 IRQ_CENTRAL_CONNECT = const(1)
 IRQ_CENTRAL_DISCONNECT = const(2)
@@ -121,6 +146,125 @@ WEIGHT_SERVICE = (
     ),
 )
 
+# TX JSON as byte pieces, assembled straight into a bytearray (same keys /
+# order as the old tx_data dict). Head indexed by TX kind (0 weight, 1 fused,
+# 2 gps) and followed by the weight; the weight channel sends zero geo fields.
+_TX_HEAD = (b'{"from":"weight","weight":', b'{"from":"fused","weight":',
+            b'{"from":"gps","weight":')
+_TX_WEIGHT_GEO = (b',"time":0,"latitude":0.0,"longitude":0.0,'
+                  b'"speed":0.0,"altitude":0.0,"accuracy":0.0')
+_TX_GEO = ((b',"time":', "time"), (b',"latitude":', "latitude"),
+           (b',"longitude":', "longitude"), (b',"speed":', "speed"),
+           (b',"altitude":', "altitude"), (b',"accuracy":', "accuracy"))
+# JSON tail for pm.idle, indexed by the bool
+_IDLE_JSON = (b',"idle":false}', b',"idle":true}')
+# Reused TX buffer size: ~120 B of keys + 7 numbers, with room to spare
+_TX_BUF_LEN = const(320)
+
+# Longest unterminated RX tail kept in rx_buffer (a few MTU-sized writes)
+_RX_MAX = const(512)
+
+# RX key token -> slot in BLEScale._rx_vals (slot k updates dict key _RX_SLOTS[k])
+_KEYS = {b"latitude": 0, b"longitude": 1, b"altitude": 2, b"speed": 3, b"time": 4, b"accuracy": 5}
+_RX_SLOTS = ("latitude", "longitude", "altitude", "speed", "time", "accuracy")
+_N_SLOTS = const(6)
+_SLOT_LAT = const(0)
+_SLOT_LON = const(1)
+_SLOT_TIME = const(4)
+
+# Byte classes of a JSON number run: 1 = sign / digit, 2 = '.' 'e' 'E' (float)
+_NUM = bytearray(256)
+for _c in b"-+0123456789":
+    _NUM[_c] = 1
+for _c in b".eE":
+    _NUM[_c] = 2
+
+
+@micropython.native
+def _scan_fields(b, i, end, vals):
+    """
+    Single pass over b[i:end] ('{' .. '}'): each quoted token found in _KEYS
+    gets the number that follows its ':' (bare or quoted) stored in its slot,
+    as int when the run has no '.', 'e' or 'E', else float ("time" is always
+    an int: a 13-digit epoch-ms run goes straight to int(), never through a
+    float). Other tokens and malformed values are skipped.
+    """
+    while True:
+        i = b.find(b'"', i, end)
+        if i < 0:
+            return
+        j = b.find(b'"', i + 1, end)
+        if j < 0:
+            return
+        slot = _KEYS.get(b[i + 1:j])
+        i = j + 1
+        if slot is None:
+            continue
+        i = b.find(b":", i, end)
+        if i < 0:
+            return
+        i += 1
+        while i < end and (b[i] == 0x20 or b[i] == 0x09):
+            i += 1
+        quoted = i < end and b[i] == 0x22
+        if quoted:
+            i += 1
+        s = i
+        cls = 0
+        while i < end:
+            c = _NUM[b[i]]
+            if not c:
+                break
+            cls |= c
+            i += 1
+        if i > s:
+            try:
+                if not cls & 2:
+                    vals[slot] = int(b[s:i])
+                elif slot == _SLOT_TIME:
+                    vals[slot] = int(float(b[s:i]))
+                else:
+                    vals[slot] = float(b[s:i])
+            except ValueError:
+                pass
+        if quoted and i < end and b[i] == 0x22:
+            i += 1
+
+
+def _tx_put(mv, n, part):
+    # Copy part into the TX buffer at n (slice store, no allocation)
+    e = n + len(part)
+    if e > _TX_BUF_LEN:
+        raise ValueError("TX payload too long")
+    mv[n:e] = part
+    return e
+
+
+def _take_lines(buf, raw):
+    """
+    Append raw to the bytearray buf and return the complete '\n'-terminated
+    lines (bytes). Only the new bytes are scanned; the unterminated tail stays
+    in buf, which is dropped once it grows past _RX_MAX without a newline.
+    """
+    lines = []
+    start = 0
+    nl = raw.find(b"\n")
+    while nl >= 0:
+        if buf:
+            buf.extend(memoryview(raw)[start:nl])
+            lines.append(bytes(buf))
+            buf[:] = b""
+        else:
+            lines.append(raw[start:nl])
+        start = nl + 1
+        nl = raw.find(b"\n", start)
+    if start < len(raw):
+        buf.extend(memoryview(raw)[start:])
+        if len(buf) > _RX_MAX:
+            # Never-terminated stream: reset instead of growing without bound
+            buf[:] = b""
+    return lines
+
 
 class BLEScale:
     """
@@ -138,6 +282,10 @@ class BLEScale:
         * Power-down HX711 when idle to save battery.
     """
 
+    # Initial / reset contents of fused_rx_data and gps_rx_data (never mutated)
+    _RX_DEFAULTS = {"time": 0, "latitude": 0.0, "longitude": 0.0,
+                    "speed": 0.0, "altitude": 0.0, "accuracy": 0.0}
+
     def __init__(self, name="ESP32S3"):
         # ─────────────────────────────────────────────────────────────
         # BLE state and configuration
@@ -145,32 +293,34 @@ class BLEScale:
         self.ble = BLE()
         self.ble.active(True)
         self.ble.config(mtu=100)  # Larger MTU for JSON payloads
+        # Bound once so the IRQ / TX paths skip the self.ble.* lookups
+        self._gatts_read = self.ble.gatts_read
+        self._gatts_write = self.ble.gatts_write
         self.ble.irq(self._irq)   # Register interrupt handler for BLE events
 
-        self._connections = set()  # Holds connection handles
+        # Connection handles in fixed slots (None = free); no set/hash table
+        # for what is almost always 0 or 1 central
+        self._connections = [None] * _MAX_CONN
+        self._n_conn = 0
+        self._mtu = {}             # Negotiated ATT MTU per connection handle
         self.connected = False     # True when at least one central is connected
         self.timer = 0             # Used for LED blink timing when not connected
+        # RX writes / TX reads seen by _irq since run() last signalled the LEDs
+        self._pending_transfers = 0
+        self._last_led_ms = 0
+        # Preallocated TX payload buffers, indexed by send_tx_as_json_response's
+        # notify flag: READ requests (_irq) never share one with run()'s
+        # notifies, which a scheduled IRQ may interrupt mid-assembly
+        self._tx_mvs = (memoryview(bytearray(_TX_BUF_LEN)),
+                        memoryview(bytearray(_TX_BUF_LEN)))
 
         # Last measured weight **in kilograms** sent to the phone
         self.weight_tx = 0.0
 
-        # Partial received data buffer for JSON lines
-        self.rx_buffer = b""
-
-        # ─────────────────────────────────────────────────────────────
-        # Power manager + HX711 + LowPowerScale
-        # ─────────────────────────────────────────────────────────────
-        # PowerManager works in **grams**.
-        #         self.pm = PowerManager()
-        # 
-        #         # HX711 load cell amplifier.
-        #         # You should calibrate SCALE so that hx.get_units() returns grams.
-        #         self.hx = HX711(DT_PIN, SCK_PIN)
-        #         self.hx.set_scale(2280)   # Calibration factor (tune so get_units() ≈ grams)
-        #         self.hx.tare()            # Zero the scale at startup
-        # 
-        #         # Wrap HX711 + PowerManager into a single helper.
-        #         self.scale = LowPowerScale(self.hx, self.pm)
+        # Partial received data buffer for JSON lines (unterminated tail only)
+        self.rx_buffer = bytearray()
+        # Per-line field slots for save_received_data (reused, see _KEYS)
+        self._rx_vals = [None] * _N_SLOTS
 
         # Last raw weight in grams (for debug if needed)
         self.last_weight_g = 0.0
@@ -178,24 +328,8 @@ class BLEScale:
         # ─────────────────────────────────────────────────────────────
         # RX data buffers for fused and GPS (received from Android)
         # ─────────────────────────────────────────────────────────────
-        self.fused_rx_data = {
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
-        self.gps_rx_data = {
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
-        # tx_data is built per-request in send_tx_as_json_response()
-        self.tx_data = {}
+        self.fused_rx_data = dict(self._RX_DEFAULTS)
+        self.gps_rx_data = dict(self._RX_DEFAULTS)
 
         # ─────────────────────────────────────────────────────────────
         # Register BLE services + start advertising
@@ -212,7 +346,15 @@ class BLEScale:
                     self.gps_rx_handle,
                 ),
             ) = self.ble.gatts_register_services((WEIGHT_SERVICE,))
-            print("BLEScale - BLE services registered")
+            if _DEBUG: print("BLEScale - BLE services registered")
+            self._tx_handles = (self.weight_tx_handle, self.fused_tx_handle, self.gps_tx_handle)
+            # Handle -> RX dict / TX kind (0 weight, 1 fused, 2 gps): one hashed
+            # lookup per event instead of an if/elif over the handle attributes.
+            # The RX dicts are reset in place by clear(), so these stay valid.
+            self._rx_targets = {self.fused_rx_handle: self.fused_rx_data,
+                                self.gps_rx_handle: self.gps_rx_data}
+            self._tx_kind = {self.weight_tx_handle: 0, self.fused_tx_handle: 1,
+                             self.gps_tx_handle: 2}
 
             # Advertising payload: device name + service UUID
             self._payload = advertising_payload(
@@ -220,7 +362,7 @@ class BLEScale:
             )
             self._advertise()
         except Exception as e:
-            print("BLE setup error:", e)
+            if _DEBUG: print("BLE setup error:", e)
             #self.blink_led(self.led_red, 3)
             self.leds.on_error()   # LED goes solid red and stays that way
 
@@ -231,6 +373,7 @@ class BLEScale:
     # ─────────────────────────────────────────────────────────────────
     # BLE IRQ handler
     # ─────────────────────────────────────────────────────────────────
+    @micropython.native
     def _irq(self, event, data):
         """
         Handle BLE events:
@@ -241,20 +384,19 @@ class BLEScale:
         if event == IRQ_CENTRAL_CONNECT:
             # A new central (e.g., Android phone) has connected.
             conn_handle, _, _ = data
-            self._connections.add(conn_handle)
-            self.connected = True
+            self._conn_add(conn_handle)
             self.leds.on_connect()  # -> BLUE blink (via update)
-            print("New connection:", conn_handle)
+            if _DEBUG: print("New connection:", conn_handle)
 
         elif event == IRQ_CENTRAL_DISCONNECT:
             # A central disconnected.
             conn_handle, _, _ = data
-            self._connections.discard(conn_handle)
-            self.connected = False
+            self._conn_discard(conn_handle)
+            self._mtu.pop(conn_handle, None)
             self.leds.on_disconnect()  # -> BLUE blink (via update)
             # Go back to advertising mode for new connections.
             self._advertise()
-            print("Disconnected:", conn_handle)
+            if _DEBUG: print("Disconnected:", conn_handle)
 
             # Clear last received fused/GPS and TX buffers on disconnect.
             self.clear()
@@ -262,32 +404,52 @@ class BLEScale:
         elif event == IRQ_GATTS_WRITE:
             # Data written by central to one of the RX characteristics.
             conn_handle, char_handle = data
-            raw_data = self.ble.gatts_read(char_handle)
             # Parse JSON line(s) and update fused_rx_data / gps_rx_data.
-            self.save_received_data(char_handle, raw_data)
-            self.leds.on_transfer()
+            self.save_received_data(char_handle, self._gatts_read(char_handle))
+            self._pending_transfers += 1   # LED signalled from run(), not here
 
         elif event == IRQ_GATTS_READ_REQUEST:
             # Central reads one of our TX characteristics.
             conn_handle, char_handle = data
-            #self.toggle_led(self.led_green)
             self.send_tx_as_json_response(char_handle)
-            self.leds.on_transfer()
-
-    def _advertise(self, interval_us=500000):
+            self._pending_transfers += 1
+
+        elif event == IRQ_MTU_EXCHANGED:
+            # MTU agreed with this central (Android: gatt.requestMtu()).
+            conn_handle, mtu = data
+            self._mtu[conn_handle] = mtu
+
+    def _conn_add(self, conn_handle):
+        conns = self._connections
+        for i in range(_MAX_CONN):
+            if conns[i] is None:
+                conns[i] = conn_handle
+                self._n_conn += 1
+                break
+        self.connected = self._n_conn > 0
+
+    def _conn_discard(self, conn_handle):
+        conns = self._connections
+        for i in range(_MAX_CONN):
+            if conns[i] == conn_handle:
+                conns[i] = None
+                self._n_conn -= 1
+                break
+        self.connected = self._n_conn > 0
+
+    def _advertise(self, interval_us=_ADV_INTERVAL_US):
         """
         Start BLE advertising so the device can be discovered.
         Called on startup and on disconnect.
+
+        The payload is built once in __init__. No stop + 50 ms pause first:
+        a second gap_advertise() call just restarts with the new parameters.
         """
         try:
-            # First stop any previous advertising to avoid conflicts.
-            self.ble.gap_advertise(None)
-            sleep(0.05)
-            # Start advertising with our payload.
             self.ble.gap_advertise(interval_us, adv_data=self._payload)
-            print("BLEScale - Advertising started")
+            if _DEBUG: print("BLEScale - Advertising started")
         except OSError as e:
-            print("Failed to advertise:", e)
+            if _DEBUG: print("Failed to advertise:", e)
 
     def _init_sensors(self):
         self.hx = HX711(CFG.DT_PIN, CFG.SCK_PIN)
@@ -299,6 +461,58 @@ class BLEScale:
         self.pm = PowerManager()
         self.scale = LowPowerScale(self.hx, self.pm)
 
+        # Background sampler: the timer callback reads the HX711 and fills
+        # the ring; get_weight() only snapshots the newest entry
+        self._w_ring = array("f", [0.0] * (_W_RING_MASK + 1))
+        self._w_head = 0
+        self._w_seen = 0           # _w_head at the last check_scale()
+        self._sample_ms = _SAMPLE_MS
+        self._timer_ms = _SAMPLE_MS    # period the timer currently runs at
+        self._sampling = False
+        self._sample_t0 = 0
+        self._sampler = Timer(_SAMPLE_TIMER_ID)
+        self._sampler.init(period=_SAMPLE_MS, mode=Timer.PERIODIC, callback=self._sample_cb)
+
+    def _sample_cb(self, _t):
+        # Never blocks: the timer callback is scheduled like the BLE IRQ, so
+        # a blocking read would hold every BLE event behind it. One tick
+        # starts an average (idle: 1 sample, active: 3), the _POLL_MS ticks
+        # after it collect the conversions that are ready.
+        scale = self.scale
+        try:
+            if not self._sampling:
+                scale.start_sample(1 if self.pm.idle else 3)
+                self._sampling = True
+                self._sample_t0 = ticks_ms()
+            weight_g = scale.poll_sample()
+        except Exception as e:
+            if _DEBUG: print("HX711 error:", e)
+            weight_g = None
+            self._sampling = False
+        if weight_g is None:
+            if self._sampling and ticks_diff(ticks_ms(), self._sample_t0) > _SAMPLE_TIMEOUT_MS:
+                if _DEBUG: print("HX711 not ready")
+                self._sampling = False
+            self._set_timer(_POLL_MS if self._sampling else self._sample_ms)
+            return
+        self._sampling = False
+        self._w_ring[self._w_head & _W_RING_MASK] = weight_g
+        self._w_head += 1
+        self._set_timer(self._sample_ms)
+
+    def _set_timer(self, ms):
+        # Re-arm only on a period change (poll <-> sample period)
+        if ms != self._timer_ms:
+            self._timer_ms = ms
+            self._sampler.init(period=ms, mode=Timer.PERIODIC, callback=self._sample_cb)
+
+    def _set_sample_period(self, ms):
+        # Follow the loop's power state (fewer HX711 wakeups when idle); an
+        # average in flight keeps polling and switches once it completes
+        self._sample_ms = ms
+        if not self._sampling:
+            self._set_timer(ms)
+
     def _init_leds(self):
         # For S3 with onboard NeoPixel
         self.leds = S3RGBManager(
@@ -307,317 +521,84 @@ class BLEScale:
             np_index=CFG.NEOPIXEL_INDEX,
             np_brightness=CFG.NEOPIXEL_BRIGHTNESS,
         )
+        # Called from run() for the transfers coalesced by _irq
+        self._on_transfer = self.leds.on_transfer
     # ─────────────────────────────────────────────────────────────────
     # RX: handling fused/GPS JSON from Android
     # ─────────────────────────────────────────────────────────────────
-    def save_received_data_1(self, attr_handle, raw_data):
-        """
-        Process and save received data (GPS and fused data).
-        Data is expected as one or more JSON lines separated by '\n'.
-
-        - Accumulates raw bytes into rx_buffer.
-        - Splits by '\n'.
-        - For each full JSON line: decode + parse + update fused_rx_data / gps_rx_data.
-        """
-        self.rx_buffer += raw_data
-
-        while b"\n" in self.rx_buffer:
-            try:
-                # Extract one JSON line (bytes) and leave the rest in rx_buffer.
-                json_bytes, self.rx_buffer = self.rx_buffer.split(b"\n", 1)
-                json_str = json_bytes.decode()
-
-                # Parse into Python dict.
-                data = ujson.loads(json_str)
-
-                # Fused location data update.
-                if attr_handle == self.fused_rx_handle:
-                    #print("fused - Decoded data:", data, "\n")
-
-                    if "latitude" in data:
-                        self.fused_rx_data["latitude"] = str(data["latitude"])
-                    if "longitude" in data:
-                        self.fused_rx_data["longitude"] = str(data["longitude"])
-                    if "altitude" in data:
-                        self.fused_rx_data["altitude"] = str(data["altitude"])
-                    if "speed" in data:
-                        self.fused_rx_data["speed"] = str(data["speed"])
-                    if "time" in data:
-                        self.fused_rx_data["time"] = str(data["time"])
-                    if "accuracy" in data:
-                        self.fused_rx_data["accuracy"] = str(data["accuracy"])
-
-                # GPS location data update.
-                if attr_handle == self.gps_rx_handle:
-                    #print("gps - Decoded data:", data, "\n")
-
-                    if "latitude" in data:
-                        self.gps_rx_data["latitude"] = str(data["latitude"])
-                    if "longitude" in data:
-                        self.gps_rx_data["longitude"] = str(data["longitude"])
-                    if "altitude" in data:
-                        self.gps_rx_data["altitude"] = str(data["altitude"])
-                    if "speed" in data:
-                        self.gps_rx_data["speed"] = str(data["speed"])
-                    if "time" in data:
-                        self.gps_rx_data["time"] = str(data["time"])
-                    if "accuracy" in data:
-                        self.gps_rx_data["accuracy"] = str(data["accuracy"])
-
-            except Exception as e:
-                print("Failed to parse data:", e)
-
-    def save_received_data_2(self, attr_handle, raw_data):
-        """
-        Alternative debug version of the parser (kept from original).
-        Not used in the main flow, but left here for debugging if needed.
-        """
-        self.rx_buffer += raw_data
-
-        while b"\n" in self.rx_buffer:
-            try:
-                json_bytes, self.rx_buffer = self.rx_buffer.split(b"\n", 1)
-                print("Raw JSON bytes:", json_bytes)
-                data = ujson.loads(json_bytes.decode())
-                json_str = json_bytes.decode()
-                print("json str data:", json_str)
-
-                if "latitude" in data:
-                    print("Latitude (after decoding):", data["latitude"])
-                if "longitude" in data:
-                    print("Longitude (after decoding):", data["longitude"])
-
-                if "latitude" in data:
-                    data["latitude"] = round(data["latitude"], 7)
-                if "longitude" in data:
-                    data["longitude"] = round(data["longitude"], 7)
-
-                if attr_handle == self.fused_rx_handle:
-                    #print("fused(fusedRx):", json_str, "\n")
-                    self.fused_rx_data.update(json_str)
-
-                elif attr_handle == self.gps_rx_handle:
-                    #print("gps(gpsRx):", json_str, "\n")
-                    self.gps_rx_data.update(json_str)
-
-            except Exception as e:
-                print("Failed to parse data:", e)
-
-    def save_received_data_3(self, attr_handle, raw_data):
-        """
-        Robust JSON-line parser for fused/gps RX.
-
-        Differences vs older version:
-        - Keeps a single buffer (self.rx_buffer) like before.
-        - For each line, we:
-            * decode with errors='ignore'
-            * strip BOM / NUL / CR
-            * crop to the first '{' and last '}'
-            * only then call ujson.loads(...)
-        - Any garbage outside the JSON object is ignored.
-        """
-
-        # 1) Accumulate raw bytes
-        self.rx_buffer += raw_data
-
-        # 2) Process complete lines separated by '\n'
-        while b"\n" in self.rx_buffer:
-            try:
-                json_bytes, self.rx_buffer = self.rx_buffer.split(b"\n", 1)
-                json_bytes = json_bytes.strip()
-                if not json_bytes:
-                    continue
-
-                # For debugging – see exactly what we got:
-                print("Raw JSON bytes:", json_bytes)
-
-                # 3) Decode, but ignore invalid UTF-8 sequences
-                try:
-                    json_str = json_bytes.decode("utf-8", "ignore")
-                except Exception as e:
-                    print("RX decode error:", e)
-                    continue
-
-                # 4) Remove common junk: BOM, NULs, CR
-                json_str = json_str.replace("\ufeff", "").replace("\x00", "").replace("\r", "")
-                json_str = json_str.strip()
-
-                # 5) Crop to the first '{' and last '}' – like you do on Android
-                lb = json_str.find("{")
-                rb = json_str.rfind("}")
-                if lb == -1 or rb == -1 or rb <= lb:
-                    print("RX fragment ignored (no full JSON object):", repr(json_str))
-                    continue
-
-                json_str = json_str[lb:rb + 1]
-
-                print("Clean JSON string:", json_str)
-
-                # 6) Finally, parse JSON
-                try:
-                    data = ujson.loads(json_str)
-                except Exception as e:
-                    print("Failed to parse data:", e, "raw JSON:", json_str)
-                    continue
-
-                # 7) Optional: debug some key fields
-                if "latitude" in data:
-                    print("Latitude (after decoding):", data["latitude"])
-                if "longitude" in data:
-                    print("Longitude (after decoding):", data["longitude"])
-
-                # 8) Optional rounding (as before)
-                if "latitude" in data:
-                    data["latitude"] = round(float(data["latitude"]), 7)
-                if "longitude" in data:
-                    data["longitude"] = round(float(data["longitude"]), 7)
-
-                # 9) Route to correct RX dict
-                if attr_handle == self.fused_rx_handle:
-                    print("fused(fusedRx):", json_str, "\n")
-                    self.fused_rx_data.update(data)
-
-                elif attr_handle == self.gps_rx_handle:
-                    print("gps(gpsRx):", json_str, "\n")
-                    self.gps_rx_data.update(data)
-
-                else:
-                    print("save_received_data: unknown handle", attr_handle, "data:", data)
-
-            except Exception as e:
-                print("save_received_data (debug) unexpected error:", e)
-
-
+    @micropython.native
     def save_received_data(self, attr_handle, raw_data):
         """
         Tolerant parser for fused/gps JSON-ish data.
 
         - Uses a single buffer (self.rx_buffer) for the stream.
         - For each newline-terminated chunk:
-            * decode UTF-8 with errors ignored
-            * strip BOM / NUL / CR / spaces
-            * crop to the first '{' and last '}'
-            * manually extract numeric fields from the string
+            * crop to the first '{' and last '}' (drops BOM / NUL / CR
+              and any other junk around the object)
+            * one left-to-right pass over the bytes picks up the numeric
+              fields (see _scan_fields); no decode, no temporary str
         - Does NOT use ujson.loads(), so it survives partially broken JSON
           that the ESP32-S3 BLE stack likes to sprinkle around.
         """
 
-        # 1) Accumulate raw bytes
-        self.rx_buffer += raw_data
+        # Route to the correct RX dict once per write; a write to any other
+        # handle is not ours to parse and breaks the line stream, so drop the
+        # pending tail with it
+        target = self._rx_targets.get(attr_handle)
+        if target is None:
+            if _DEBUG: print("save_received_data: unknown handle", attr_handle)
+            self.rx_buffer[:] = b""
+            return
+        vals = self._rx_vals
 
-        # 2) Process every complete line
-        while b"\n" in self.rx_buffer:
+        # 1) Accumulate raw bytes (bounded) and 2) process every complete line
+        for json_bytes in _take_lines(self.rx_buffer, raw_data):
             try:
-                json_bytes, self.rx_buffer = self.rx_buffer.split(b"\n", 1)
-                json_bytes = json_bytes.strip()
                 if not json_bytes:
                     continue
 
                 # Debug raw bytes
-                print("Raw JSON bytes:", json_bytes)
+                if _DEBUG: print("Raw JSON bytes:", json_bytes)
 
-                # 3) Decode (ignore bad sequences)
-                try:
-                    s = json_bytes.decode("utf-8", "ignore")
-                except Exception as e:
-                    print("RX decode error:", e)
-                    continue
-
-                # 4) Strip common garbage
-                s = s.replace("\ufeff", "").replace("\x00", "").replace("\r", "")
-                s = s.strip()
-                if not s:
-                    continue
-
-                # 5) Crop to first '{' and last '}'
-                lb = s.find("{")
-                rb = s.rfind("}")
+                # 3) Crop to first '{' and last '}'
+                lb = json_bytes.find(b"{")
+                rb = json_bytes.rfind(b"}")
                 if lb == -1 or rb == -1 or rb <= lb:
-                    print("RX fragment ignored (no full JSON object):", repr(s))
+                    if _DEBUG: print("RX fragment ignored (no full JSON object):", json_bytes)
                     continue
 
-                s = s[lb:rb + 1]
-                print("Clean JSON string:", s)
-
-                # 6) Helper to extract a numeric value from "json-ish" text
-                def _extract_number(text, key, default=None):
-                    pattern = '"' + key + '"'
-                    i = text.find(pattern)
-                    if i == -1:
-                        return default
-                    # find colon after the key
-                    i = text.find(":", i)
-                    if i == -1:
-                        return default
-                    i += 1
-                    # skip spaces
-                    while i < len(text) and text[i] in " \t":
-                        i += 1
-                    start = i
-                    while i < len(text) and text[i] in "-+0123456789.eE":
-                        i += 1
-                    if start == i:
-                        return default
-                    try:
-                        return float(text[start:i])
-                    except Exception:
-                        return default
-
-                # 7) Extract fields
-                lat  = _extract_number(s, "latitude")
-                lon  = _extract_number(s, "longitude")
-                alt  = _extract_number(s, "altitude")
-                spd  = _extract_number(s, "speed")
-                t    = _extract_number(s, "time")
-                acc  = _extract_number(s, "accuracy")
+                # 4) Extract fields into the slot list (None = not present)
+                for k in range(_N_SLOTS):
+                    vals[k] = None
+                _scan_fields(json_bytes, lb, rb, vals)
 
                 # Optional rounding for lat/lon
-                if lat is not None:
-                    lat = round(float(lat), 7)
-                if lon is not None:
-                    lon = round(float(lon), 7)
-
-                # 8) Route to correct RX dict and update only existing values
-                target = None
-                if attr_handle == self.fused_rx_handle:
-                    target = self.fused_rx_data
-                    print("Updating fused_rx_data from:", s)
-                elif attr_handle == self.gps_rx_handle:
-                    target = self.gps_rx_data
-                    print("Updating gps_rx_data from:", s)
-                else:
-                    print("save_received_data: unknown handle", attr_handle, "line:", s)
-                    target = None
-
-                if target is not None:
-                    if lat is not None:
-                        target["latitude"] = lat
-                    if lon is not None:
-                        target["longitude"] = lon
-                    if alt is not None:
-                        target["altitude"] = alt
-                    if spd is not None:
-                        target["speed"] = spd
-                    if t is not None:
-                        # keep as int-ish timestamp if you like
-                        try:
-                            target["time"] = int(t)
-                        except Exception:
-                            target["time"] = t
-                    if acc is not None:
-                        target["accuracy"] = acc
+                if vals[_SLOT_LAT] is not None:
+                    vals[_SLOT_LAT] = round(vals[_SLOT_LAT], 7)
+                if vals[_SLOT_LON] is not None:
+                    vals[_SLOT_LON] = round(vals[_SLOT_LON], 7)
+
+                # 5) Update only the values present in this line
+                if _DEBUG: print("Updating rx data from:", json_bytes)
+                for k in range(_N_SLOTS):
+                    v = vals[k]
+                    if v is not None:
+                        target[_RX_SLOTS[k]] = v
 
             except Exception as e:
                 # Very defensive: never let a bad line crash the loop
-                print("save_received_data tolerant parser unexpected error:", e)
+                if _DEBUG: print("save_received_data tolerant parser unexpected error:", e)
 
     # ─────────────────────────────────────────────────────────────────
     # TX: JSON response for weight / fused / gps
     # ─────────────────────────────────────────────────────────────────
-    def send_tx_as_json_response(self, attr_handle):
+    def send_tx_as_json_response(self, attr_handle, notify=False):
         """
         Build and send JSON response over a TX characteristic.
 
+        The value is always stored (gatts_write) for READ requests; with
+        notify=True (run() loop) it is also pushed to every connected central.
+
         Format (example):
         {
           "from": "weight" | "fused" | "gps",
@@ -631,102 +612,92 @@ class BLEScale:
           "idle": true|false    # <— allows Android to switch power profile
         }
         """
-        # Base payload: always include weight and idle flag.
-        self.tx_data = {
-            "from": "",
-            "weight": self.weight_tx,  # kilograms for the app
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-            "idle": self.pm.idle,
-        }
+        # Always include weight (kilograms for the app) and idle flag.
+        idle = _IDLE_JSON[self.pm.idle]
 
-        # Decide which data block to fill based on the requested handle.
-        if attr_handle == self.weight_tx_handle:
-            self.tx_data["from"] = "weight"
-
-        elif attr_handle == self.fused_tx_handle:
-            self.tx_data.update(self.fused_rx_data)
-            self.tx_data["from"] = "fused"
-            print("sending fused_rx_data :", self.tx_data, "\n")
-
-        elif attr_handle == self.gps_tx_handle:
-            self.tx_data.update(self.gps_rx_data)
-            self.tx_data["from"] = "gps"
-            print("sending gps_rx_data :", self.tx_data, "\n")
+        # Assemble the bytes for the requested handle (no str + encode copy)
+        kind = self._tx_kind.get(attr_handle)
+        if kind is None:
+            if _DEBUG: print("Unknown TX handle:", attr_handle)
+            return
 
-        else:
-            print("Unknown TX handle:", attr_handle)
+        # Written into the preallocated buffer; payload is a view of it
+        mv = self._tx_mvs[notify]
+        try:
+            end = _tx_put(mv, 0, _TX_HEAD[kind])
+            end = _tx_put(mv, end, str(self.weight_tx).encode())
+            if kind == 0:
+                end = _tx_put(mv, end, _TX_WEIGHT_GEO)
+            elif kind == 1:
+                end = self._put_geo(mv, end, self.fused_rx_data)
+            else:
+                end = self._put_geo(mv, end, self.gps_rx_data)
+            end = _tx_put(mv, end, idle)
+        except ValueError as e:
+            if _DEBUG: print("TX build failed:", e)
             return
+        payload = mv[:end]
+        if _DEBUG: print("sending TX", kind, ":", bytes(payload), "\n")
 
         try:
-            self.ble.gatts_write(attr_handle, ujson.dumps(self.tx_data).encode())
+            self._gatts_write(attr_handle, payload)
         except Exception as e:
-            print("Failed to send response:", e)
-
-    # ─────────────────────────────────────────────────────────────────
-    # LED helpers
-    # ─────────────────────────────────────────────────────────────────
-    # ─────────────────────────────────────────────────────────────────
-    # LED helpers
-    # ─────────────────────────────────────────────────────────────────
-    def toggle_led(self):
-        """
-        For backward compatibility: just advance LED animation.
-        Effect:
-          - If not connected : blue blink/toggle via S3RGBManager
-          - If connected     : solid blue or green blink (on transfer)
-        """
-        #self.leds.update()
-        pass
-
-    def off_all(self):
-        """Turn off all LEDs."""
-        #self.leds.off_all()
-        pass
+            if _DEBUG: print("Failed to send response:", e)
+
+        # A notify is cut at MTU-3: push it in full-size pieces for the
+        # smallest negotiated MTU. A READ gets the value above only (long
+        # reads fetch the rest by offset), never an unsolicited notify.
+        if notify:
+            self._notify_chunks(attr_handle, payload, self._max_payload())
+
+    def _max_payload(self):
+        """Largest notify payload every connected central accepts."""
+        m = 0
+        for c in self._connections:
+            if c is None:
+                continue
+            v = self._mtu.get(c, _MTU_DEFAULT)
+            if not m or v < m:
+                m = v
+        return (m or _MTU_DEFAULT) - _ATT_HDR
+
+    def _notify_chunks(self, attr_handle, payload, n):
+        mv = memoryview(payload)
+        for c in self._connections:
+            if c is None:
+                continue
+            try:
+                for i in range(0, len(payload), n):
+                    self.ble.gatts_notify(c, attr_handle, mv[i:i + n])
+            except OSError as e:
+                if _DEBUG: print("Notify failed:", e)
 
+    def _put_geo(self, mv, n, d):
+        for key_b, key in _TX_GEO:
+            n = _tx_put(mv, n, key_b)
+            n = _tx_put(mv, n, str(d[key]).encode())
+        return n
 
     # ─────────────────────────────────────────────────────────────────
     # Weight reading + power-optimized HX711 usage via LowPowerScale
     # ─────────────────────────────────────────────────────────────────
     def get_weight(self):
         """
-        Read weight using LowPowerScale.
+        Latest weight from the timer-driven sampler (no HX711 access here).
 
         Internally:
-        - LowPowerScale always works in grams (HX711 calibrated accordingly).
-        - PowerManager.update_with_weight() is called inside LowPowerScale.
+        - _sample_cb reads via LowPowerScale, which works in grams (HX711
+          calibrated accordingly) and feeds PowerManager.update_with_weight().
         - HX711 is powered down when idle (inside LowPowerScale low-power mode).
 
         Externally:
         - This method returns kilograms (for LEDs / JSON to phone).
         """
-        try:
-            # Choose mode based on current idle state:
-            # - When NOT idle  -> normal active mode (more averaging).
-            # - When idle      -> low-power read (still without extra sleep;
-            #                    outer loop controls timing).
-            if self.pm.idle:
-                weight_g = self.scale.read_weight_low_power(
-                    times=1,
-                    idle_sleep_ms=0,  # no internal sleep; run() controls loop timing
-                )
-            else:
-                weight_g = self.scale.read_weight_normal(times=3)
-
-            self.last_weight_g = weight_g
+        weight_g = self._w_ring[(self._w_head - 1) & _W_RING_MASK]
+        self.last_weight_g = weight_g
 
-            # Convert to kilograms for the rest of the app.
-            #weight_kg = weight_g / 1000.0
-            weight_kg = weight_g / 1000
-            return weight_kg
-
-        except Exception as e:
-            print("HX711 error:", e)
-            return 0.0
+        # Convert to kilograms for the rest of the app.
+        return weight_g / 1000
 
     def check_scale(self):
         """
@@ -734,7 +705,12 @@ class BLEScale:
         - Reads weight (in kg) using get_weight().
         - Keeps weight_tx updated (so TX JSON always has fresh weight).
         - Uses LEDs to signal basic weight state.
+        - Skipped until the sampler has stored a new reading.
         """
+        head = self._w_head
+        if head == self._w_seen:
+            return
+        self._w_seen = head
         weight_kg = self.get_weight()
         self.weight_tx = weight_kg
 
@@ -753,28 +729,13 @@ class BLEScale:
     # ─────────────────────────────────────────────────────────────────
     def clear(self):
         """
-        Reset received fused/GPS data and TX buffer.
+        Reset received fused/GPS data in place (same dict objects).
         Called on BLE disconnect.
         """
-        self.fused_rx_data = {
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
-        self.gps_rx_data = {
-            "time": 0,
-            "latitude": 0.0,
-            "longitude": 0.0,
-            "speed": 0.0,
-            "altitude": 0.0,
-            "accuracy": 0.0,
-        }
-        self.tx_data = {}
-
-        print("RX and TX data reset")
+        # Only _RX_DEFAULTS keys are ever stored, so update() resets every one
+        self.fused_rx_data.update(self._RX_DEFAULTS)
+        self.gps_rx_data.update(self._RX_DEFAULTS)
+        if _DEBUG: print("RX and TX data reset")
 
     # ─────────────────────────────────────────────────────────────────
     # Main loop – dynamic sleep based on PowerManager state
@@ -797,32 +758,50 @@ class BLEScale:
         self.timer = ticks_ms()
 
         while True:
-            # 1. Read latest weight and update PowerManager (via LowPowerScale).
+            # One timestamp per pass, shared by the timer guards and the LEDs
+            now = ticks_ms()
+
+            # 1. Snapshot the sampler's latest weight (PowerManager is fed there).
             self.check_scale()
 
+            # 1a. Push fresh weight / fused / gps (NOTIFY) instead of waiting
+            #     for the central to issue READ requests
+            if self.connected:
+                for h in self._tx_handles:
+                    self.send_tx_as_json_response(h, notify=True)
+
+            # 1b. One green transfer window for all the BLE traffic since the
+            #     last pass (the IRQ only counts events)
+            if self._pending_transfers:
+                if ticks_diff(now, self._last_led_ms) > _XFER_LED_MS:
+                    self._pending_transfers = 0
+                    self._last_led_ms = now
+                    self._on_transfer()
+
             # 2. Connection LED behavior:
             #    - If not connected: blink blue every 1s.
             #    - If connected: keep blue ON.
             if not self.connected:
-                now = ticks_ms()
                 if ticks_diff(now, self.timer) > 1000:
-                    #self.toggle_led(self.led_blue)
                     self.leds.on_connect()
                     self.timer = now
             else:
                 #self.led_blue.on()
-                self.leds.update()
+                self.leds.update(now)
 
             # 3. Decide how long to sleep based on power state:
             #    This is purely CPU / loop timing (does NOT deep sleep the chip).
             if self.pm.should_enter_deep_idle():
-                base_sleep = 5.0   # seconds – very slow loop when long idle
+                base_ms = 5000   # very slow loop when long idle
             elif self.pm.idle:
-                base_sleep = 2.0   # seconds – no load but not long enough for deep idle
+                base_ms = 2000   # no load but not long enough for deep idle
             else:
-                base_sleep = 0.5   # seconds – active mode, more frequent reads
+                base_ms = 500    # active mode, more frequent reads
 
-            sleep(base_sleep)
+            # The sampler reads once per loop period. Plain sleep_ms, not
+            # lightsleep: that would pause the sampler's hardware timer.
+            self._set_sample_period(base_ms)
+            sleep_ms(base_ms)
 
 
 if __name__ == "__main__":
@@ -835,6 +814,6 @@ if __name__ == "__main__":
     except Exception as e:
         print("Error:", e)
     finally:
-        scale.off_all()
+        scale.leds.off_all()
         print("Shutdown complete.")
 
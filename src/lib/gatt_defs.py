@@ -1,10 +1,10 @@
 # =============================================================================
 # Project  : Unforgotten – ESP BLE Scale
 # File     : gatt_defs.py
-# Version  : 1.4.0
+# Version  : 1.5.0
 # Author   : you
 # Summary  : GATT schema for gatts_register_services
-# Behavior : Simple tuples; notify TX, write RX for 3 topics (weight/fused/gps)
+# Behavior : Prebuilt tuples; notify TX, write RX for 3 topics (weight/fused/gps)
 # Purpose  : Central BLE attributes
 # Style    : Minimal, explicit
 # =============================================================================
@@ -14,16 +14,30 @@ from lib.common_const import FLAG_READ, FLAG_NOTIFY, FLAG_WRITE, FLAG_WRITE_NO_R
 
 GATT_SCHEMA_VERSION = "1.4.0"
 
-WEIGHT_SERVICE_UUID = bluetooth.UUID("00001234-0000-1000-8000-00805f9b34fb")
+# Weight TX layout by schema version:
+#   1.4.0  JSON {"from":"weight","weight":<kg>,...,"idle":true|false}
+#   1.5.0  5 bytes, struct "<fB" = (weight kg as LE float32, idle 0/1);
+#          fused / gps TX are still the 1.4.0 JSON (unf_s3_v1_3_1)
+GATT_SCHEMA_VERSION_BIN = "1.5.0"
 
-WEIGHT_CHAR_TX = (bluetooth.UUID("00002345-0000-1000-8000-00805f9b34fb"), FLAG_READ | FLAG_NOTIFY)
-WEIGHT_CHAR_RX = (bluetooth.UUID("00003345-0000-1000-8000-00805f9b34fb"), FLAG_WRITE | FLAG_WRITE_NO_RESPONSE)
+# All UUIDs are 0000xxxx-0000-1000-8000-00805f9b34fb. Built from the raw
+# little-endian bytes (what UUID stores internally): no hex-string parse at
+# import, and the module is frozen so the schema tuples live in flash
+_UUID_BASE = b"\xfb\x34\x9b\x5f\x80\x00\x00\x80\x00\x10\x00\x00"
 
-FUSED_CHAR_TX  = (bluetooth.UUID("00004345-0000-1000-8000-00805f9b34fb"), FLAG_READ | FLAG_NOTIFY)
-FUSED_CHAR_RX  = (bluetooth.UUID("00005345-0000-1000-8000-00805f9b34fb"), FLAG_WRITE | FLAG_WRITE_NO_RESPONSE)
+def _uuid(x):
+    return bluetooth.UUID(_UUID_BASE + bytes((x & 0xFF, x >> 8, 0, 0)))
 
-GPS_CHAR_TX    = (bluetooth.UUID("00006345-0000-1000-8000-00805f9b34fb"), FLAG_READ | FLAG_NOTIFY)
-GPS_CHAR_RX    = (bluetooth.UUID("00007345-0000-1000-8000-00805f9b34fb"), FLAG_WRITE | FLAG_WRITE_NO_RESPONSE)
+WEIGHT_SERVICE_UUID = _uuid(0x1234)
+
+WEIGHT_CHAR_TX = (_uuid(0x2345), FLAG_READ | FLAG_NOTIFY)
+WEIGHT_CHAR_RX = (_uuid(0x3345), FLAG_WRITE | FLAG_WRITE_NO_RESPONSE)
+
+FUSED_CHAR_TX  = (_uuid(0x4345), FLAG_READ | FLAG_NOTIFY)
+FUSED_CHAR_RX  = (_uuid(0x5345), FLAG_WRITE | FLAG_WRITE_NO_RESPONSE)
+
+GPS_CHAR_TX    = (_uuid(0x6345), FLAG_READ | FLAG_NOTIFY)
+GPS_CHAR_RX    = (_uuid(0x7345), FLAG_WRITE | FLAG_WRITE_NO_RESPONSE)
 
 WEIGHT_SERVICE = (
     WEIGHT_SERVICE_UUID,
@@ -1,26 +1,52 @@
-from lib.hx711 import HX711
+import micropython
+from array import array
+from lib.sensors.hx711_driver import HX711
+
+
+@micropython.viper
+def _sum_i(buf, n: int) -> int:
+    # Integer sum of the first n entries of an array('i'), no boxing per sample
+    p = ptr32(buf)
+    total = 0
+    for i in range(n):
+        total += p[i]
+    return total
+
 
 class HX711Reader:
     def __init__(self, dt_pin=5, sck_pin=4, scale=2280):
         self.hx = HX711(dt_pin, sck_pin)
         self.hx.set_scale(scale)
         self.hx.tare()
+        # Raw-sample batch for read_average_fast(); grown on demand, then reused
+        self._batch = array("i", (0,) * 16)
 
 #     def get_weight(self):
 #         return self.hx.get_units(10)  # Average 10 readings
 
     def tare(self, times=15):
-        
+
         return self.hx.tare(times)
-        
+
     def read(self):
-        
+
         return self.hx.read()
 
     def read_average(self, times=5):
-        
+
         return self.hx.read_average(times)
 
+    def read_average_fast(self, times=5):
+        # One batch of raw frames (each clocked by the driver's viper loop)
+        # into the preallocated array, then a viper integer sum
+        buf = self._batch
+        if len(buf) < times:
+            buf = self._batch = array("i", (0,) * times)
+        read = self.hx.read
+        for i in range(times):
+            buf[i] = read()
+        return _sum_i(buf, times) / times
+
     def make_average(self, times=5):
-        
-        return self.hx.make_average(times)
\ No newline at end of file
+
+        return "%.1f" % self.read_average_fast(times)
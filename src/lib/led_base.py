@@ -0,0 +1,176 @@
+# =============================================================================
+# File    : led_base.py
+# Purpose : Shared non-blocking LED state machine for all board LED managers.
+# Model   : One priority ladder, evaluated to (colour, on) and handed to the
+#           concrete manager's _apply(); subclasses only drive hardware.
+#
+# States (highest priority first):
+#   - Error        : C_R blinks  (red window), or C_R solid until clear_error()
+#                    when latched (error_latch=True)
+#   - Transfer     : C_G blinks  (green window, only while connected)
+#   - Connected    : C_B solid
+#   - Disconnected : C_B blinks
+# =============================================================================
+import micropython
+from array import array
+from micropython import const
+from time import ticks_ms, ticks_diff, ticks_add
+
+# Re-check interval while the output is steady (events force an earlier pass)
+_IDLE_MS = const(60_000)
+# Per-colour step of the boot self-test (R, G, B, off), run from update()
+_SELF_TEST_MS = const(120)
+
+# Slots of the packed state array self._s (array('l'), -1 = unset)
+_S_T_XFER   = const(0)
+_S_T_ERR    = const(1)
+_S_CONN     = const(2)
+_S_DIRTY    = const(3)
+_S_NEXT     = const(4)
+_S_W_GREEN  = const(5)
+_S_W_RED    = const(6)
+_S_H_BLUE   = const(7)
+_S_SH_BLUE  = const(8)
+_S_H_GREEN  = const(9)
+_S_SH_GREEN = const(10)
+_S_H_RED    = const(11)
+_S_SH_RED   = const(12)
+
+
+def _half_shift(period, snap=False):
+    # (half-period, shift): shift is set when half is a power of two so
+    # _blink_v can use now >> shift instead of now // half (-1 = no shift)
+    if period <= 0: return 0, -1
+    half = period // 2 or 1
+    s = 0
+    while (1 << s) < half: s += 1
+    if (1 << s) != half:
+        if not snap: return half, -1
+        print("[LED] half-period %d ms snapped to %d ms" % (half, 1 << s))
+        half = 1 << s
+    return half, s
+
+# ---- viper integer helpers (no boxing; -1 = unset / no shift) ---------------
+@micropython.viper
+def _win_v(now:int, t0:int, win:int) -> int:
+    # t0 >= 0 and ticks_diff(now, t0) < win  (ticks wrap at 2**30)
+    if t0 < 0: return 0
+    d = (now - t0) & 0x3FFFFFFF
+    if d >= 0x20000000: d -= 0x40000000
+    return 1 if d < win else 0
+
+@micropython.viper
+def _blink_v(now:int, half:int, shift:int) -> int:
+    if half <= 0: return 0
+    if shift >= 0: return (now >> shift) & 1
+    return (now // half) & 1
+
+@micropython.native
+def _edge(now, half, t0=-1, win=0):
+    # Next tick at which the output can change: blink edge or window end
+    nxt = ticks_add(now, _IDLE_MS) if half <= 0 else ticks_add(now, half - now % half)
+    if t0 >= 0 and ticks_diff(ticks_add(t0, win), nxt) < 0: nxt = ticks_add(t0, win)
+    return nxt
+
+
+class BaseLedManager:
+    # Colour ids: index the per-colour tables subclasses precompute from RGB
+    C_OFF = 0
+    C_R   = 1   # Red   – error
+    C_G   = 2   # Green – transfer
+    C_B   = 3   # Blue  – connection/search
+    RGB   = ((0, 0, 0), (255, 0, 0), (0, 255, 0), (0, 0, 255))
+
+    def _init_state(self, blue_blink_period_ms, green_pulse_window_ms, green_blink_period_ms,
+                    red_error_window_ms, red_blink_period_ms, snap_pow2=False, error_latch=False):
+        hb, sb = _half_shift(int(blue_blink_period_ms),  snap_pow2)
+        hg, sg = _half_shift(int(green_blink_period_ms), snap_pow2)
+        hr, sr = _half_shift(int(red_blink_period_ms),   snap_pow2)
+        self._s = array('l', (-1, -1, 0, 1, 0, int(green_pulse_window_ms), int(red_error_window_ms),
+                              hb, sb, hg, sg, hr, sr))
+        self._last_c = None; self._last_on = -1
+        self._err_latch = error_latch; self._err_on = False
+        self._st_q = []; self._st_next = 0
+        self._mode = self._m_search   # per-state evaluator, re-picked on events only
+
+    def _start_self_test(self):
+        # Deferred R/G/B/off sweep on the NeoPixel (_set_rgb) instead of sleeping in __init__
+        self._st_q = [self.C_R, self.C_G, self.C_B, self.C_OFF]; self._st_next = ticks_ms()
+
+    # ----- explicit on/off style API -----------------------------------------
+    def on_connect(self):
+        s = self._s; s[_S_CONN] = 1; s[_S_DIRTY] = 1
+        if not self._err_on: self._show(self.C_B, 1)
+    def on_disconnect(self): s = self._s; s[_S_CONN] = 0; s[_S_T_XFER] = -1; s[_S_DIRTY] = 1
+    def on_transfer(self):   s = self._s; s[_S_T_XFER] = ticks_ms(); s[_S_DIRTY] = 1
+    def on_error(self):
+        s = self._s; s[_S_T_ERR] = ticks_ms(); s[_S_DIRTY] = 1
+        if self._err_latch: self._err_on = True
+    def clear_error(self):   self._err_on = False; s = self._s; s[_S_T_ERR] = -1; s[_S_DIRTY] = 1
+    def off_all(self):       self._s[_S_DIRTY] = 1; self._show(self.C_OFF, 0)
+
+    @micropython.native
+    def update(self, now=None):
+        # now: optional ticks_ms() value shared by the caller's loop iteration
+        if now is None: now = ticks_ms()
+        s = self._s
+        q = self._st_q
+        if q:
+            # Self-test owns the output until its queue drains
+            if ticks_diff(now, self._st_next) < 0: return
+            self._set_rgb(q.pop(0)); self._st_next = ticks_add(now, _SELF_TEST_MS)
+            if not q: self._last_c = None; s[_S_DIRTY] = 1
+            return
+        # Nothing can change before the next edge unless an event came in
+        if not s[_S_DIRTY] and ticks_diff(now, s[_S_NEXT]) < 0: return
+        if s[_S_DIRTY]: s[_S_DIRTY] = 0; self._mode = self._pick(now, s)
+        c, on = self._mode(now, s)
+        self._show(c, on)
+
+    def _pick(self, now, s):
+        # Priority ladder, run only on events and when a window runs out
+        if self._err_on: return self._m_latched
+        if _win_v(now, s[_S_T_ERR], s[_S_W_RED]): return self._m_error
+        if not s[_S_CONN]: return self._m_search
+        if _win_v(now, s[_S_T_XFER], s[_S_W_GREEN]): return self._m_xfer
+        return self._m_connected
+
+    # ----- per-state evaluators -> (colour, on); each schedules the next edge --
+    @micropython.native
+    def _m_error(self, now, s):
+        t0 = s[_S_T_ERR]; w = s[_S_W_RED]
+        if not _win_v(now, t0, w): self._mode = self._pick(now, s); return self._mode(now, s)
+        h = s[_S_H_RED]; s[_S_NEXT] = _edge(now, h, t0, w)
+        return self.C_R, _blink_v(now, h, s[_S_SH_RED])
+
+    @micropython.native
+    def _m_xfer(self, now, s):
+        t0 = s[_S_T_XFER]; w = s[_S_W_GREEN]
+        if not _win_v(now, t0, w): self._mode = self._m_connected; return self._m_connected(now, s)
+        h = s[_S_H_GREEN]; s[_S_NEXT] = _edge(now, h, t0, w)
+        return self.C_G, _blink_v(now, h, s[_S_SH_GREEN])
+
+    def _m_latched(self, now, s):
+        s[_S_NEXT] = ticks_add(now, _IDLE_MS)
+        return self.C_R, 1
+
+    def _m_connected(self, now, s):
+        s[_S_NEXT] = ticks_add(now, _IDLE_MS)
+        return self.C_B, 1
+
+    @micropython.native
+    def _m_search(self, now, s):
+        h = s[_S_H_BLUE]; s[_S_NEXT] = _edge(now, h)
+        return self.C_B, _blink_v(now, h, s[_S_SH_BLUE])
+
+    @micropython.native
+    def _show(self, c, on):
+        # Only touch hardware when the evaluated output changed
+        if c == self._last_c and on == self._last_on: return
+        self._last_c = c; self._last_on = on
+        self._apply(c, on)
+
+    def _apply(self, c, on):
+        # Hardware hook, overridden by every board manager: drive colour c
+        # (C_R/C_G/C_B/C_OFF) for blink phase on (0/1). The base drives nothing
+        pass
@@ -1,41 +1,61 @@
 from machine import Pin
+from micropython import const
 from common_const import RED_LED_PIN, GREEN_LED_PIN, BLUE_LED_PIN
 
+# Shadow bits in self._mask: one per LED, so a toggle never reads the pin back
+_M_BLUE = const(1)
+_M_GREEN = const(2)
+_M_RED = const(4)
+
 class LEDManager:
     def __init__(self, blue_pin=BLUE_LED_PIN, green_pin=GREEN_LED_PIN, red_pin=RED_LED_PIN):
         self.blue = Pin(blue_pin, Pin.OUT)
         self.green = Pin(green_pin, Pin.OUT)
         self.red = Pin(red_pin, Pin.OUT)
-        self.off_all()
+        self._mask = 0
+        self.allOff()
 
     def toggleBlue(self):
-        self.blue.value(not self.blue.value())
+        self._mask ^= _M_BLUE
+        self.blue.value(self._mask & _M_BLUE)
         
     def toggleGreen(self):
-        self.green.value(not self.green.value())
+        self._mask ^= _M_GREEN
+        self.green.value(self._mask & _M_GREEN)
     
     def toggleRed(self):
-        self.red.value(not self.red.value())
+        self._mask ^= _M_RED
+        self.red.value(self._mask & _M_RED)
 
     def blueOn(self):
+        self._mask |= _M_BLUE
         self.blue.value(1)
         
     def greenOn(self):
+        self._mask |= _M_GREEN
         self.green.value(1)
         
     def redOn(self):
+        self._mask |= _M_RED
         self.red.value(1)
 
     def blueOff(self):
+        self._mask &= ~_M_BLUE
         self.blue.value(0)
         
-    def greenOn(self):
+    def greenOff(self):
+        self._mask &= ~_M_GREEN
         self.green.value(0)
         
     def redOff(self):
+        self._mask &= ~_M_RED
         self.red.value(0)
 
     def allOff(self):
-        self.blueOff()
-        self.greenOff()
-        self.redOff()
+        self._mask = 0
+        self.blue.value(0)
+        self.green.value(0)
+        self.red.value(0)
+
+    # Same name as the other LED managers
+    off_all = allOff
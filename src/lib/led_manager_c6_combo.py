@@ -75,8 +75,9 @@ class C6ComboLEDManager:
     def on_error(self):      self._t_err=ticks_ms()
     def off_all(self):       self._set_rgb(self.C_OFF)
 
-    def update(self):
-        now=ticks_ms()
+    def update(self, now=None):
+        # now: optional ticks_ms() value shared by the caller's loop iteration
+        if now is None: now=ticks_ms()
 
         # Error dominates
         if self._win(now,self._t_err,self._w_red):
@@ -0,0 +1,166 @@
+# =============================================================================
+# File    : led_rgb_state.py
+# Purpose : One NeoPixel (WS2812) status LED manager for every board in lib/:
+#           onboard RGB pixel + optional mono status LED, state machine from
+#           lib.led_base (blue=conn, green=activity, red=error).
+# Options : mono_led_pin=None  -> RGB only
+#           error_mode="window" -> red blinks for red_error_window_ms
+#           error_mode="flag"   -> red solid until clear_error()
+#           rmt_channel=0       -> WS2812 waveform from esp32.RMT (None or no
+#                                  RMT -> neopixel module)
+# Wake    : rtc_cache=True (opt-in) keeps the last pixel bytes in RTC memory,
+#           tagged with _RTC_MAGIC; after a deep sleep / soft reset the
+#           still-lit pixel is not cleared, self-tested or repainted with the
+#           same colour. It takes over the whole RTC().memory() block, so
+#           leave it off when the application stores anything there.
+# Aliases : NeoPixelLedManager / FireBeetleRGBManager / S3RGBManager (the
+#           per-board classes this replaces) all resolve to RGBStateLed.
+# =============================================================================
+import micropython
+from machine import Pin
+from micropython import const
+from lib.led_base import BaseLedManager
+try:
+    import esp32
+except ImportError:
+    esp32 = None
+try:
+    import neopixel
+except ImportError:
+    neopixel = None
+try:
+    from machine import RTC
+except ImportError:
+    RTC = None
+
+# WS2812 bit timings for esp32.RMT at clock_div=2 (80 MHz APB -> 25 ns ticks)
+_T0H = const(16); _T0L = const(34)   # 0.40 / 0.85 us
+_T1H = const(32); _T1L = const(18)   # 0.80 / 0.45 us
+
+# rtc_cache record: magic + format version, then the 3 GRB pixel bytes
+_RTC_MAGIC = b"LED\x01"
+_RTC_TAG = const(4)
+_RTC_LEN = const(7)
+
+def _grb(rgb, b):
+    # Palette colour -> brightness-scaled 3-byte GRB pixel (WS2812 wire order)
+    r,g,bv = rgb
+    return bytes((int(g*b), int(r*b), int(bv*b)))
+
+def _rmt_pulses(frame):
+    # GRB frame bytes -> RMT high/low durations (MSB first)
+    out=[]
+    for c in frame:
+        for i in range(7,-1,-1):
+            if (c>>i)&1: out.append(_T1H); out.append(_T1L)
+            else:        out.append(_T0H); out.append(_T0L)
+    return tuple(out)
+
+class _RmtWS2812:
+    # neopixel.NeoPixel surface (px[i]=rgb, buf, write()) on the RMT peripheral:
+    # the waveform is clocked out in hardware, no CPU busy loop
+    def __init__(self, pin, n, channel=0):
+        self._rmt = esp32.RMT(channel, pin=Pin(pin, Pin.OUT), clock_div=2)
+        self.n = n
+        self.buf = bytearray(3 * n)   # whole strip, GRB per pixel (NeoPixel layout)
+        self._trains = {}   # frame bytes -> pulse train (the palette is small)
+
+    def __len__(self): return self.n
+    def __setitem__(self, i, rgb):
+        r,g,b = rgb; j = 3 * i
+        self.buf[j] = g; self.buf[j+1] = r; self.buf[j+2] = b
+    def __getitem__(self, i):
+        j = 3 * i
+        return (self.buf[j+1], self.buf[j], self.buf[j+2])
+
+    def write(self):
+        # One train for the whole strip; write_pulses() returns while the
+        # RMT channel is still shifting it out
+        key = bytes(self.buf)
+        p = self._trains.get(key)
+        if p is None:
+            p = self._trains[key] = _rmt_pulses(key)
+        self._rmt.write_pulses(p, 1)  # start high
+
+class RGBStateLed(BaseLedManager):
+    def __init__(
+        self, np_pin, *, np_count=1, np_index=0, np_brightness=0.2,
+        mono_led_pin=None, active_low_mono=False,
+        blue_blink_period_ms=1000, green_pulse_window_ms=600, green_blink_period_ms=200,
+        red_error_window_ms=2000, red_blink_period_ms=180, error_mode="window",
+        rmt_channel=0, self_test=True, snap_pow2=False, rtc_cache=False
+    ):
+        self._ok=False; self._np=None
+        self._idx=int(np_index)
+        # Brightness applied once; _set_rgb() copies a pre-rendered GRB pixel
+        self._palette=[_grb(rgb, float(np_brightness)) for rgb in self.RGB]
+        self._px=None
+        # RMT peripheral generates the waveform in hardware; neopixel is the fallback
+        if esp32 and rmt_channel is not None:
+            try:
+                self._np = _RmtWS2812(np_pin, int(np_count), rmt_channel)
+                self._ok=True
+            except Exception as e:
+                print("[NeoPixel] RMT init error:", e)
+        if self._np is None:
+            if neopixel:
+                try:
+                    self._np = neopixel.NeoPixel(Pin(np_pin, Pin.OUT), int(np_count))
+                    self._ok=True
+                except Exception as e:
+                    print("[NeoPixel] init error:", e)
+            else:
+                print("[NeoPixel] module missing.")
+        if self._ok:
+            # This pixel's 3 bytes in the driver's GRB frame (both backends expose .buf)
+            j=3*self._idx
+            self._px=memoryview(self._np.buf)[j:j+3]
+        # Colour id on the pixel right now (-1 = unknown: first write always goes out)
+        self._shown=-1; self._rtc=None
+        if rtc_cache and self._ok and RTC is not None:
+            try:
+                self._rtc=RTC()
+                # Tagged records per palette colour, built once (no alloc per write)
+                self._rtc_pal=[_RTC_MAGIC + p for p in self._palette]
+                m=self._rtc.memory()
+                if len(m) == _RTC_LEN and m[:_RTC_TAG] == _RTC_MAGIC:
+                    self._shown=self._palette.index(m[_RTC_TAG:])
+            except (ValueError, OSError):
+                pass   # no / foreign / stale cache (other brightness): repaint as usual
+
+        self._mono = Pin(mono_led_pin, Pin.OUT, value=0) if mono_led_pin is not None else None
+        self._set_mono = (self._mono_none if self._mono is None else
+                          self._mono_inv if active_low_mono else self._mono_high)
+
+        self._init_state(blue_blink_period_ms, green_pulse_window_ms, green_blink_period_ms,
+                         red_error_window_ms, red_blink_period_ms, snap_pow2,
+                         error_latch=(error_mode == "flag"))
+
+        if self._shown < 0:
+            # Cold boot: clear the pixel and run the sweep
+            self._set_rgb(self.C_OFF)
+            if self._ok and self_test: self._start_self_test()
+        self._set_mono(0)
+
+    def _apply(self, c, on): self._set_rgb(c if on else self.C_OFF); self._set_mono(on)
+
+    @micropython.native
+    def _set_rgb(self, rgb):
+        if not self._ok or rgb == self._shown: return
+        try:
+            self._px[:]=self._palette[rgb]   # one 3-byte copy, no tuple packing
+            self._np.write()
+            self._shown=rgb
+            # RTC slow memory is SRAM: a write per colour change costs no wear
+            if self._rtc is not None: self._rtc.memory(self._rtc_pal[rgb])
+        except Exception as e:
+            print("[NeoPixel] write error:", e)
+            self._ok=False
+
+    # _set_mono is bound to one of these at construction (no per-call polarity test)
+    def _mono_none(self, v): pass
+    def _mono_high(self, v): self._mono.value(v)
+    def _mono_inv(self, v):  self._mono.value(1 - v)
+
+# Former per-board class names (same constructor keywords)
+NeoPixelLedManager = FireBeetleRGBManager = S3RGBManager = RGBStateLed
@@ -1,9 +1,14 @@
 # low_power_scale.py
 import time
+from micropython import const
 
 from power_manager import PowerManager
 from sensors.hx711_driver import HX711
 
+# Longest wait for the first conversion after power-up (HX711 settles in
+# ~400 ms at 10 SPS); past it read() keeps polling DOUT itself
+_READY_TIMEOUT_MS = const(500)
+
 
 class LowPowerScale:
     """
@@ -16,22 +21,51 @@ class LowPowerScale:
         self.hx = hx
         self.pm = pm
         self._last_weight_g = 0.0
+        # HX711 comes up powered (driver leaves PD_SCK low)
+        self._powered = True
+        # start_sample() / poll_sample() state: wanted, taken, raw sum
+        self._want = 0
+        self._got = 0
+        self._sum = 0
 
     @property
     def last_weight(self) -> float:
         return self._last_weight_g
 
+    def _wait_ready(self, timeout_ms=_READY_TIMEOUT_MS):
+        """
+        Sleep until the HX711 pulls DOUT low (data ready): the driver's
+        falling-edge IRQ wakes the CPU, no blind settle delay.
+        """
+        return self.hx.wait_ready(timeout_ms)
+
+    def _power_up(self):
+        # Only a real wake pays the PD_SCK toggle + first conversion
+        if not self._powered:
+            self.hx.power_up()
+            # First sample after power up: wait for DRDY instead of sleeping
+            self._wait_ready()
+            self._powered = True
+
+    def _power_down(self):
+        if self._powered:
+            self.hx.power_down()
+            self._powered = False
+
     def read_weight_normal(self, times: int = 3) -> float:
         """
         Active mode:
-        - HX711 stays powered (power_up called just in case)
+        - one power-up window for all `times` samples (no-op while the
+          HX711 is already up); powered down again once the scale is idle
         - we read with more averaging and higher frequency.
         """
-        self.hx.power_up()
+        self._power_up()
         # get_units() returns grams if SCALE/OFFSET are calibrated
         weight = self.hx.get_units(times=times)
         self.pm.update_with_weight(weight)
         self._last_weight_g = weight
+        if self.pm.idle:
+            self._power_down()
         return weight
 
     def read_weight_low_power(self,
@@ -43,16 +77,77 @@ class LowPowerScale:
         - Update idle state
         - If still idle, power_down and sleep for idle_sleep_ms
         """
-        self.hx.power_up()
-        # HX711 needs a bit of time to settle after power up
-        time.sleep_ms(50)
+        self._power_up()
 
         weight = self.hx.get_units(times=times)
         self.pm.update_with_weight(weight)
         self._last_weight_g = weight
 
         if self.pm.idle:
-            self.hx.power_down()
+            self._power_down()
             time.sleep_ms(idle_sleep_ms)
 
         return weight
+
+    def start_sample(self, times: int = 3):
+        """
+        Begin a non-blocking average of `times` conversions: powers up
+        without the settle wait, poll_sample() then collects the samples.
+        """
+        if not self._powered:
+            self.hx.power_up()
+            self._powered = True
+        self._want = times
+        self._got = 0
+        self._sum = 0
+
+    def poll_sample(self):
+        """
+        Read the conversions that are ready right now (read() never waits
+        here). Returns grams once start_sample()'s count is in (PowerManager
+        updated, powered down if idle), else None.
+        """
+        hx = self.hx
+        while self._got < self._want and hx.is_ready():
+            self._sum += hx.read()
+            self._got += 1
+        if self._got < self._want:
+            return None
+        weight = (self._sum / self._got - hx.OFFSET) / hx.SCALE
+        self._want = 0
+        self.pm.update_with_weight(weight)
+        self._last_weight_g = weight
+        if self.pm.idle:
+            self._power_down()
+        return weight
+
+    async def read_weight_async(self, timeout_ms=_READY_TIMEOUT_MS):
+        """
+        uasyncio variant of the two modes above (idle: 1 sample, active: 3),
+        same power handling, but each sample awaits hx.ready_flag, set by
+        the driver's DOUT IRQ, so other tasks run during the conversion.
+        Raises OSError if DOUT stays high for timeout_ms.
+        """
+        import uasyncio
+        hx = self.hx
+        flag = hx.ready_flag
+        times = 1 if self.pm.idle else 3
+        if not self._powered:
+            # no blocking settle wait: the first sample awaits DRDY below
+            hx.power_up()
+            self._powered = True
+        total = 0
+        for _ in range(times):
+            while not hx.is_ready():
+                # a stale set() from an earlier edge just loops back here
+                try:
+                    await uasyncio.wait_for_ms(flag.wait(), timeout_ms)
+                except uasyncio.TimeoutError:
+                    raise OSError("HX711 not ready")
+            total += hx.read()   # DOUT already low: read() does not wait
+        weight = (total / times - hx.OFFSET) / hx.SCALE
+        self.pm.update_with_weight(weight)
+        self._last_weight_g = weight
+        if self.pm.idle:
+            self._power_down()
+        return weight
@@ -1,11 +1,27 @@
 # power_manager.py
-import time
+import micropython
+from array import array
+from micropython import const
+from time import ticks_ms, ticks_diff
 
-# Tune these for your real noise level and behavior:
-#NO_LOAD_THRESHOLD_G = 50.0      # abs(weight) below this ⇒ "no load"
-NO_LOAD_THRESHOLD_G = 1.0      # abs(weight) below this ⇒ "no load"
-NO_LOAD_STABLE_SAMPLES = 20     # consecutive no-load samples
-NO_LOAD_IDLE_SECONDS = 30       # after this idle time ⇒ deep-idle candidate
+# Tune these for your real noise level and behavior (const(): folded into the
+# bytecode, no global lookup per sample). Weights are compared in 0.01 g.
+#_NO_LOAD_THRESHOLD_CG = const(5000)   # 50 g
+_NO_LOAD_THRESHOLD_CG = const(100)     # abs(weight) below 1.0 g ⇒ "no load"
+_NO_LOAD_STABLE_SAMPLES = const(20)    # consecutive no-load samples
+_NO_LOAD_IDLE_MS = const(30_000)       # after this idle time ⇒ deep-idle candidate
+
+
+@micropython.viper
+def _spread(buf, n: int) -> int:
+    # max - min of the first n entries of an array('i') (centigrams)
+    p = ptr32(buf)
+    lo = int(p[0]); hi = lo
+    for i in range(1, n):
+        v = int(p[i])
+        if v < lo: lo = v
+        if v > hi: hi = v
+    return hi - lo
 
 
 class PowerManager:
@@ -16,25 +32,50 @@ class PowerManager:
 
     def __init__(self):
         self._no_load_count = 0
-        self._last_active_ms = time.ticks_ms()
+        self._last_active_ms = ticks_ms()
         self.idle = False  # "soft" idle (no load, stable)
+        # Last _NO_LOAD_STABLE_SAMPLES weights in 0.01 g (fits int32 even for an
+        # uncalibrated full-scale reading), overwritten in place
+        self._buf = array("i", (0,) * _NO_LOAD_STABLE_SAMPLES)
+        self._head = 0
+        self._n = 0        # ring entries filled so far (saturates)
 
     def update_with_weight(self, weight_g: float):
         """
         Call this after each weight reading.
+        Only a loaded sample reads the clock; no-load samples just count.
         """
-        if abs(weight_g) < NO_LOAD_THRESHOLD_G:
+        w = int(weight_g * 100)
+        h = self._head
+        self._buf[h] = w
+        h += 1
+        self._head = 0 if h == _NO_LOAD_STABLE_SAMPLES else h
+        if self._n < h:
+            self._n = h
+
+        if -_NO_LOAD_THRESHOLD_CG < w < _NO_LOAD_THRESHOLD_CG:
             self._no_load_count += 1
         else:
             # any real load = active
             self._no_load_count = 0
-            self._last_active_ms = time.ticks_ms()
+            self._last_active_ms = ticks_ms()
             self.idle = False
             return
 
-        if self._no_load_count >= NO_LOAD_STABLE_SAMPLES:
+        if self._no_load_count >= _NO_LOAD_STABLE_SAMPLES:
             self.idle = True
 
+    def stable(self, spread_g: float = None) -> bool:
+        """
+        True when the last _NO_LOAD_STABLE_SAMPLES readings lie within
+        spread_g (default: the no-load threshold) of each other, loaded or
+        not (False until the ring has filled once). One viper scan, no
+        allocation.
+        """
+        n = self._n
+        lim = _NO_LOAD_THRESHOLD_CG if spread_g is None else int(spread_g * 100)
+        return n == _NO_LOAD_STABLE_SAMPLES and _spread(self._buf, n) <= lim
+
     def should_enter_deep_idle(self) -> bool:
         """
         Returns True when we've been idle long enough
@@ -43,6 +84,5 @@ class PowerManager:
         if not self.idle:
             return False
 
-        elapsed_ms = time.ticks_diff(time.ticks_ms(), self._last_active_ms)
-        elapsed_s = elapsed_ms / 1000.0
-        return elapsed_s > NO_LOAD_IDLE_SECONDS
+        # Integer ms compare: no float seconds
+        return ticks_diff(ticks_ms(), self._last_active_ms) > _NO_LOAD_IDLE_MS
@@ -1,7 +1,134 @@
 # hx711_driver.py
 # Your HX711 implementation, slightly cleaned ("is" -> "==") to avoid identity bugs.
 
-from machine import Pin, enable_irq, disable_irq, idle
+import os
+import micropython
+from array import array
+from machine import Pin, enable_irq, disable_irq, idle, mem32
+from time import ticks_ms, ticks_us, ticks_diff
+from micropython import const
+
+# Samples in the read_moving() window
+_RING_N = const(20)
+# DOUT polls per read_batch() sample before giving up (HX711 missing / down)
+_SPIN_MAX = const(1 << 24)
+# Minimum SCK high (T3) / low (T4) time in ns from the datasheet (0.2 us), and
+# the spin length used to time the pad loop once at construction
+_HALF_NS = const(200)
+_CAL_N = const(10_000)
+
+# (W1TS, W1TC, IN) per GPIO bank per chip: bank 0 = pins 0..31
+# (GPIO_OUT_W1TS / GPIO_OUT_W1TC / GPIO_IN), bank 1 = pins 32.. (GPIO_OUT1_*
+# / GPIO_IN1), for the register-level readout; other chips fall back to
+# Pin.value() bit-banging
+_GPIO_REGS = {
+    "ESP32":   ((0x3FF44008, 0x3FF4400C, 0x3FF4403C), (0x3FF44014, 0x3FF44018, 0x3FF44040)),
+    "ESP32S3": ((0x60004008, 0x6000400C, 0x6000403C), (0x60004014, 0x60004018, 0x60004040)),
+    "ESP32C6": ((0x60091008, 0x6009100C, 0x6009103C),),
+}
+
+
+def _gpio_regs(dout, pd_sck):
+    # array('I', (w1ts, w1tc, in, pad)) for SCK's / DOUT's banks (masks:
+    # 1 << (pin & 31)), or None when the chip or a pin's bank is unsupported.
+    # pad is the per-phase spin count, _spin_pad() for this CPU clock
+    if not (isinstance(dout, int) and isinstance(pd_sck, int)):
+        return None
+    try:
+        banks = _GPIO_REGS.get(os.uname().machine.rsplit(" ", 1)[-1])
+    except AttributeError:
+        return None
+    if not banks or max(dout, pd_sck) >> 5 >= len(banks):
+        return None
+    s = banks[pd_sck >> 5]
+    return array("I", (s[0], s[1], banks[dout >> 5][2], _spin_pad()))
+
+
+@micropython.viper
+def _spin(n: int) -> int:
+    # the pad loop of the kernels below, on its own for _spin_pad()
+    j = 0
+    while j < n:
+        j += 1
+    return j
+
+
+def _spin_pad():
+    # _spin() iterations covering _HALF_NS, timed with IRQs off (an IRQ in
+    # the window would shrink the pad), rounded up plus one for margin
+    state = disable_irq()
+    t0 = ticks_us()
+    _spin(_CAL_N)
+    dt = ticks_diff(ticks_us(), t0)
+    enable_irq(state)
+    return (_HALF_NS * _CAL_N + dt * 1000 - 1) // (max(dt, 1) * 1000) + 1
+
+
+@micropython.viper
+def _shift_in(n: int, dt_mask: uint, sck_mask: uint, regs) -> int:
+    # n SCK pulses via W1TS/W1TC, each phase padded by regs[3] spins (T3/T4
+    # >= 0.2 us). DOUT is sampled at the end of the low phase: it is valid
+    # 0.1 us after the rising edge and holds until the next one. Only the
+    # first 24 (data) bits are kept, not the trailing gain/channel pulses
+    r = ptr32(regs)
+    w1ts = ptr32(r[0]); w1tc = ptr32(r[1]); gin = ptr32(r[2])
+    pad = int(r[3])
+    result = 0
+    for i in range(n):
+        w1ts[0] = sck_mask
+        j = 0
+        while j < pad:
+            j += 1
+        w1tc[0] = sck_mask
+        j = 0
+        while j < pad:
+            j += 1
+        if i < 24:
+            result = (result << 1) | (1 if uint(gin[0]) & dt_mask else 0)
+    return result
+
+
+@micropython.viper
+def _read_batch(out, n: int, masks, regs) -> int:
+    # n sign-extended samples into out (array('i')): busy-wait for DOUT low,
+    # then one IRQ-off frame of masks[2] pulses per sample. masks = (dt, sck,
+    # pulses). Returns the samples taken (< n: DOUT stayed high _SPIN_MAX polls)
+    o = ptr32(out); m = ptr32(masks); r = ptr32(regs)
+    w1ts = ptr32(r[0]); w1tc = ptr32(r[1]); gin = ptr32(r[2])
+    dt = uint(m[0]); sck = uint(m[1]); pulses = int(m[2]); pad = int(r[3])
+    for k in range(n):
+        spin = 0
+        while uint(gin[0]) & dt:
+            spin += 1
+            if spin > _SPIN_MAX:
+                return k
+        state = disable_irq()
+        result = 0
+        for i in range(pulses):
+            # same padded frame as _shift_in, DOUT sampled after the low pad
+            w1ts[0] = sck
+            j = 0
+            while j < pad:
+                j += 1
+            w1tc[0] = sck
+            j = 0
+            while j < pad:
+                j += 1
+            if i < 24:
+                result = (result << 1) | (1 if uint(gin[0]) & dt else 0)
+        enable_irq(state)
+        if result & 0x800000:
+            result -= 0x1000000
+        o[k] = result
+    return n
+
+
+def _ema_shift(tc):
+    # k >= 1 with 2**-k nearest to the time constant: EMA step as a shift
+    k = 1
+    while abs(1 / (1 << (k + 1)) - tc) < abs(1 / (1 << k) - tc):
+        k += 1
+    return k
 
 
 class HX711:
@@ -11,12 +138,43 @@ class HX711:
         self.pOUT = Pin(dout, mode=Pin.IN, pull=Pin.PULL_DOWN)
         self.pSCK.value(False)
 
+        # Register-level readout (viper) when the chip / pins allow it
+        self._regs = _gpio_regs(dout, pd_sck)
+        if self._regs is not None:
+            self._dt_mask = 1 << (dout & 31)
+            self._sck_mask = 1 << (pd_sck & 31)
+            self._in_addr = self._regs[2]
+        self.is_ready = self._is_ready_pin if self._regs is None else self._is_ready_reg
+
+        # read_batch(): (dt, sck, pulses) for the viper kernel + reused sample buffer
+        if self._regs is not None:
+            self._masks = array("I", (self._dt_mask, self._sck_mask, 0))
+        self._batch = array("i")
+
         self.GAIN = 0
         self.OFFSET = 0
         self.SCALE = 1
+        # Integer OFFSET for the moving window, 1/SCALE for get_units()
+        self._offset_int = 0
+        self._inv_scale = 1.0
 
         self.time_constant = 0.1
         self.filtered = 0
+        # Integer EMA step (filtered += (x - filtered) >> k), opt-in through
+        # set_time_constant(tc, shift=True); 0 = float EMA with time_constant
+        self._ema_k = 0
+
+        # DOUT falling-edge IRQ: wakes wait_ready()'s idle(). An async app
+        # sets ready_flag (a uasyncio.ThreadSafeFlag) to await the same edge
+        # instead of installing a second DOUT handler over this one
+        self.ready_flag = None
+        self.pOUT.irq(trigger=Pin.IRQ_FALLING, handler=self._on_ready)
+
+        # Moving window for read_moving(): offset-corrected ints, running sum
+        self._ring = array("i", (0,) * _RING_N)
+        self._ring_sum = 0
+        self._ring_idx = 0
+        self._ring_n = 0
 
         self.set_gain(gain)
 
@@ -28,30 +186,67 @@ class HX711:
             self.GAIN = 3
         elif gain == 32:
             self.GAIN = 2
+        else:
+            # GAIN = 0 would clock a 24-pulse frame and misread the sign bit
+            raise ValueError("gain must be 128/64/32")
 
         self.read()
         self.filtered = self.read()
         print("HX711 - Gain & initial value set")
 
-    def is_ready(self):
+    # is_ready is bound to one of these at construction (no per-call test)
+    def _is_ready_pin(self):
         return self.pOUT() == 0
 
+    def _is_ready_reg(self):
+        # one GPIO_IN load + AND, no Pin call
+        return not (mem32[self._in_addr] & self._dt_mask)
+
+    def _on_ready(self, pin):
+        f = self.ready_flag
+        if f is not None:
+            f.set()
+
+    def wait_ready(self, timeout_ms=0):
+        # Sleep in idle() until DOUT goes low (data ready). The DOUT IRQ only
+        # wakes the CPU; the pin itself is the ready test, since a flag set by
+        # an earlier edge could be stale. 0 = no timeout
+        ready = self.is_ready
+        t0 = ticks_ms()
+        while not ready():
+            if timeout_ms and ticks_diff(ticks_ms(), t0) >= timeout_ms:
+                return False
+            idle()
+        return True
+
     def read(self):
         # wait for the device being ready
-        while self.pOUT() == 1:
-            idle()
+        self.wait_ready()
 
         # shift in data, and gain & channel info
-        result = 0
-        for j in range(24 + self.GAIN):
+        if self._regs is not None:
+            # IRQs off for the whole (few us) frame: SCK high > 60 us powers the HX711 down
             state = disable_irq()
-            self.pSCK(True)
-            self.pSCK(False)
+            result = _shift_in(24 + self.GAIN, self._dt_mask, self._sck_mask, self._regs)
             enable_irq(state)
-            result = (result << 1) | self.pOUT()
+        else:
+            # same single IRQ window around the Pin loop (locals: no attribute lookups)
+            sck = self.pSCK; out = self.pOUT
+            result = 0
+            state = disable_irq()
+            try:
+                for j in range(24):
+                    sck(True)
+                    sck(False)
+                    result = (result << 1) | out()
+                # gain & channel select: clock only, DOUT carries nothing
+                for j in range(self.GAIN):
+                    sck(True)
+                    sck(False)
+            finally:
+                enable_irq(state)
 
-        # shift back the extra bits
-        result >>= self.GAIN
+        # result holds exactly the 24 data bits (small int, no extra shift)
 
         # check sign
         if result > 0x7FFFFF:
@@ -59,28 +254,91 @@ class HX711:
 
         return result
 
-    def read_average(self, times=5):
-        total = 0
-        for _ in range(times):
-            total += self.read()
-        return total / times
+    def read_average(self, times=5, batch=False):
+        # batch=True: one read_batch() kernel instead of `times` read() calls
+        if batch:
+            return sum(self.read_batch(times)) / times
+        # sum() accumulates in C; bound method cached
+        read = self.read
+        return sum(read() for _ in range(times)) / times
+
+    def read_batch(self, n):
+        # n raw samples (memoryview over a reused array('i')) from one viper
+        # kernel that busy-waits on DOUT: for calibration / bench tools, the
+        # firmware paths keep the idle() wait of read()
+        buf = self._batch
+        if len(buf) < n:
+            buf = self._batch = array("i", (0,) * n)
+        if self._regs is None:
+            read = self.read
+            for i in range(n):
+                buf[i] = read()
+        else:
+            m = self._masks
+            m[2] = 24 + self.GAIN
+            if _read_batch(buf, n, m, self._regs) < n:
+                raise OSError("HX711 not ready")
+        return memoryview(buf)[:n]
 
     def make_average(self, times=5):
-        total = 0
-        for _ in range(times):
-            total += self.read()
-        ssum = (total / times)
-        return "%.1f" % (ssum)
+        return "%.1f" % self.read_average(times)
+
+    def read_stats(self, times=40):
+        # (mean, min, max, std) of `times` offset-corrected reads in one pass
+        # (Welford: running mean / M2, no sample list kept)
+        read = self.read; off = self.OFFSET
+        mean = 0.0; m2 = 0.0
+        mn = mx = None
+        for i in range(1, times + 1):
+            x = read() - off
+            if mn is None or x < mn: mn = x
+            if mx is None or x > mx: mx = x
+            d = x - mean
+            mean += d / i
+            m2 += d * (x - mean)
+        return mean, mn, mx, (m2 / times) ** 0.5
+
+    def _push(self, x):
+        # O(1) window update: swap the oldest sample out of the running sum
+        i = self._ring_idx
+        self._ring_sum += x - self._ring[i]
+        self._ring[i] = x
+        i += 1
+        self._ring_idx = 0 if i == _RING_N else i
+        if self._ring_n < _RING_N:
+            self._ring_n += 1
+
+    def _ring_reset(self):
+        for i in range(_RING_N):
+            self._ring[i] = 0
+        self._ring_sum = 0
+        self._ring_idx = 0
+        self._ring_n = 0
+
+    def read_moving(self):
+        # One new sample; moving get_value(): mean of the last _RING_N
+        # offset-corrected samples (fewer until filled)
+        self._push(self.read() - self._offset_int)
+        return self._ring_sum / self._ring_n
+
+    def get_units_moving(self):
+        return self.read_moving() * self._inv_scale
 
     def read_lowpass(self):
-        self.filtered += self.time_constant * (self.read() - self.filtered)
+        k = self._ema_k
+        if k:
+            # shift-and-add: no float multiply (soft-float on C3/C6); the
+            # half-step added first rounds instead of flooring toward -inf
+            self.filtered += (self.read() - self.filtered + (1 << (k - 1))) >> k
+        else:
+            self.filtered += self.time_constant * (self.read() - self.filtered)
         return self.filtered
 
-    def get_value(self, times=3):
-        return self.read_average(times) - self.OFFSET
+    def get_value(self, times=3, batch=False):
+        return self.read_average(times, batch) - self.OFFSET
 
-    def get_units(self, times=3):
-        return self.get_value(times) / self.SCALE
+    def get_units(self, times=3, batch=False):
+        return self.get_value(times, batch) * self._inv_scale
 
     def tare(self, times=15):
         total = self.read_average(times)
@@ -88,15 +346,26 @@ class HX711:
 
     def set_scale(self, scale):
         self.SCALE = scale
+        self._inv_scale = 1.0 / scale
 
     def set_offset(self, offset):
         self.OFFSET = offset
+        # the window holds values relative to the old offset: start over
+        self._offset_int = int(offset)
+        self._ring_reset()
 
-    def set_time_constant(self, time_constant=None):
+    def set_time_constant(self, time_constant=None, shift=False):
+        # shift=True trades the exact constant for the nearest 2**-k, so
+        # read_lowpass() runs in integers (e.g. 0.1 becomes 0.125)
         if time_constant is None:
             return self.time_constant
         elif 0 < time_constant < 1.0:
             self.time_constant = time_constant
+            if shift:
+                self.filtered = int(self.filtered)
+                self._ema_k = _ema_shift(time_constant)
+            else:
+                self._ema_k = 0
 
     def power_down(self):
         self.pSCK.value(False)
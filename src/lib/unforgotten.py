@@ -48,7 +48,7 @@ Changelog
     - Added "idle" field to BLE TX JSON payload.
 """
 
-from time import sleep, ticks_ms, ticks_diff
+from time import sleep, sleep_ms, ticks_ms, ticks_diff
 from machine import Pin
 from micropython import const
 import bluetooth
@@ -70,6 +70,17 @@ IRQ_CENTRAL_DISCONNECT = const(2)
 IRQ_GATTS_WRITE = const(3)
 IRQ_GATTS_READ_REQUEST = const(4)
 
+# ATT MTU we ask for (a whole JSON payload per notify), the default before /
+# without an exchange, and the ATT header a notify carries
+_MTU = const(247)
+_MTU_DEFAULT = const(23)
+_ATT_HDR = const(3)
+
+# run() loop periods (ms): deep idle / idle / active
+_SLEEP_DEEP_MS = const(5000)
+_SLEEP_IDLE_MS = const(2000)
+_SLEEP_ACTIVE_MS = const(500)
+
 # UUIDs for the weight, fused, and GPS services and characteristics
 # These must match what your Android app expects.
 WEIGHT_SERVICE_UUID = bluetooth.UUID("00001234-0000-1000-8000-00805f9b34fb")
@@ -140,16 +151,21 @@ class BLEScale:
         # ─────────────────────────────────────────────────────────────
         self.ble = BLE()
         self.ble.active(True)
-        self.ble.config(mtu=100)  # Larger MTU for JSON payloads
+        self.ble.config(mtu=_MTU)  # Larger MTU for JSON payloads
         self.ble.irq(self._irq)   # Register interrupt handler for BLE events
 
         self._connections = set()  # Holds connection handles
+        self._mtu = {}             # Negotiated ATT MTU per connection handle
         self.connected = False     # True when at least one central is connected
         self.timer = 0             # Used for LED blink timing when not connected
 
         # Last measured weight **in kilograms** sent to the phone
         self.weight_tx = 0.0
 
+        # Notify slots, one per TX handle: a new value overwrites the one
+        # still waiting, so a congested link only ever sends the latest
+        self._pending_tx = {}
+
         # Partial received data buffer for JSON lines
         self.rx_buffer = b""
 
@@ -243,11 +259,17 @@ class BLEScale:
             self.connected = True
             self.led_blue.on()
             print("New connection:", conn_handle)
+            try:
+                # Peripheral-initiated exchange: no need to wait for the phone
+                self.ble.gattc_exchange_mtu(conn_handle)
+            except (AttributeError, OSError) as e:
+                print("MTU exchange not started:", e)
 
         elif event == IRQ_CENTRAL_DISCONNECT:
             # A central disconnected.
             conn_handle, _, _ = data
             self._connections.discard(conn_handle)
+            self._mtu.pop(conn_handle, None)
             self.connected = False
             self.led_blue.off()
             # Go back to advertising mode for new connections.
@@ -270,6 +292,11 @@ class BLEScale:
             self.toggle_led(self.led_green)
             self.send_tx_as_json_response(char_handle)
 
+        elif event == IRQ_MTU_EXCHANGED:
+            conn_handle, mtu = data
+            self._mtu[conn_handle] = mtu
+            print("MTU exchanged:", mtu)
+
     def _advertise(self, interval_us=500000):
         """
         Start BLE advertising so the device can be discovered.
@@ -401,6 +428,17 @@ class BLEScale:
           "idle": true|false    # <— allows Android to switch power profile
         }
         """
+        payload = self._tx_json(attr_handle)
+        if payload is None:
+            return
+
+        try:
+            self.ble.gatts_write(attr_handle, payload)
+        except Exception as e:
+            print("Failed to send response:", e)
+
+    def _tx_json(self, attr_handle):
+        """JSON bytes for a TX handle (None for an unknown handle)."""
         # Base payload: always include weight and idle flag.
         self.tx_data = {
             "from": "",
@@ -430,12 +468,47 @@ class BLEScale:
 
         else:
             print("Unknown TX handle:", attr_handle)
-            return
+            return None
 
-        try:
-            self.ble.gatts_write(attr_handle, ujson.dumps(self.tx_data).encode())
-        except Exception as e:
-            print("Failed to send response:", e)
+        return ujson.dumps(self.tx_data).encode()
+
+    # ─────────────────────────────────────────────────────────────────
+    # Notify: overwrite-latest per TX handle
+    # ─────────────────────────────────────────────────────────────────
+    def queue_notify(self, attr_handle, payload):
+        """Replace whatever is still pending for attr_handle."""
+        self._pending_tx[attr_handle] = payload
+
+    def _drain_notify(self):
+        """
+        Push the pending slots to every connected central (called from run()).
+        MicroPython has no notify-sent event, so a full controller queue
+        (ENOMEM / congested) just leaves the slot for the next pass, by which
+        time it may already hold a newer value. A notify carries at most
+        mtu-3 bytes: a central with a smaller MTU gets the JSON in mtu-3
+        pieces, in order, to join until the closing '}'.
+        """
+        pending = self._pending_tx
+        if not pending or not self._connections:
+            return
+        mtus = self._mtu
+        notify = self.ble.gatts_notify
+        for h, data in list(pending.items()):
+            n = len(data)
+            try:
+                for c in self._connections:
+                    m = mtus.get(c, _MTU_DEFAULT) - _ATT_HDR
+                    if n <= m:
+                        notify(c, h, data)
+                    else:
+                        mv = memoryview(data)
+                        for i in range(0, n, m):
+                            notify(c, h, mv[i:i + m])
+            except OSError as e:
+                print("Notify deferred:", e)
+                return
+            if pending.get(h) is data:
+                del pending[h]
 
     # ─────────────────────────────────────────────────────────────────
     # LED helpers
@@ -509,6 +582,8 @@ class BLEScale:
         """
         weight_kg = self.get_weight()
         self.weight_tx = weight_kg
+        if self.connected:
+            self.queue_notify(self.weight_tx_handle, self._tx_json(self.weight_tx_handle))
 
         # Example visual logic:
         # - If weight > 1 kg and not some error (e.g. -128) → turn on green LED.
@@ -543,6 +618,7 @@ class BLEScale:
             "accuracy": 0.0,
         }
         self.tx_data = {}
+        self._pending_tx.clear()
 
         print("RX and TX data reset")
 
@@ -560,6 +636,9 @@ class BLEScale:
              * Idle (no load, recent):  medium loop (2 s)
              * Deep idle (long idle):   slow loop (5 s)
 
+          All periods are plain sleep_ms(): machine.lightsleep() would stall
+          the BLE controller, so a disconnected scale would stop advertising.
+
         This reduces:
         - HX711 active time (via LowPowerScale + PowerManager).
         - CPU wakeups and power consumption.
@@ -567,8 +646,10 @@ class BLEScale:
         self.timer = ticks_ms()
 
         while True:
-            # 1. Read latest weight and update PowerManager (via LowPowerScale).
+            # 1. Read latest weight and update PowerManager (via LowPowerScale),
+            #    then send whatever notify slots are pending.
             self.check_scale()
+            self._drain_notify()
 
             # 2. Connection LED behavior:
             #    - If not connected: blink blue every 1s.
@@ -581,16 +662,14 @@ class BLEScale:
             else:
                 self.led_blue.on()
 
-            # 3. Decide how long to sleep based on power state:
-            #    This is purely CPU / loop timing (does NOT deep sleep the chip).
+            # 3. Decide how long to sleep based on power state.
             if self.pm.should_enter_deep_idle():
-                base_sleep = 5.0   # seconds – very slow loop when long idle
+                ms = _SLEEP_DEEP_MS     # very slow loop when long idle
             elif self.pm.idle:
-                base_sleep = 2.0   # seconds – no load but not long enough for deep idle
+                ms = _SLEEP_IDLE_MS     # no load but not long enough for deep idle
             else:
-                base_sleep = 0.5   # seconds – active mode, more frequent reads
-
-            sleep(base_sleep)
+                ms = _SLEEP_ACTIVE_MS   # active mode, more frequent reads
+            sleep_ms(ms)
 
 
 if __name__ == "__main__":
@@ -6,12 +6,6 @@
 import time
 from machine import Pin
 
-try:
-    import neopixel
-    HAVE_NP = True
-except ImportError:
-    HAVE_NP = False
-
 # Known pins :
 # FireBeetle 2 with esp32-e NeoPixel RGB pin = 5
 # esp32-c6  NeoPixel RGB pin = 8
@@ -28,56 +22,94 @@ MONO_LED_PIN        = 15    # set to None if you have no mono LED
 MONO_ACTIVE_LOW     = False # try True later if first mono test fails
 # ==========================================================================
 
-def show_np(np, idx, rgb, brightness=1.0):
-    r, g, b = rgb
-    np[idx] = (int(r*brightness), int(g*brightness), int(b*brightness))
+def precompute_color(rgb, brightness):
+    return (int(rgb[0]*brightness), int(rgb[1]*brightness), int(rgb[2]*brightness))
+
+# Test colours, scaled once (brightness is fixed for the whole run)
+RED   = precompute_color((255, 0, 0), NEOPIXEL_BRIGHTNESS)
+GREEN = precompute_color((0, 255, 0), NEOPIXEL_BRIGHTNESS)
+BLUE  = precompute_color((0, 0, 255), NEOPIXEL_BRIGHTNESS)
+OFF   = (0, 0, 0)
+
+_neopixel = None   # module once imported, False when the firmware lacks it
+
+def load_neopixel():
+    # Imported on first NeoPixel use, not at module import: tools that only
+    # import this file (e.g. next to the HX711 scripts) don't pay for it
+    global _neopixel
+    if _neopixel is None:
+        try:
+            import neopixel
+            _neopixel = neopixel
+        except ImportError:
+            _neopixel = False
+    return _neopixel or None
+
+def show_np(np, idx, color):
+    # color: one of the pre-scaled tuples above
+    np[idx] = color
     np.write()
 
 def mono_set(pin_obj, v, active_low=False):
     if pin_obj is None:
         return
-    if active_low:
-        v = 0 if v else 1
-    pin_obj.value(v)
+    # polarity as XOR: no branch per edge
+    pin_obj.value((1 if v else 0) ^ (1 if active_low else 0))
 
 def blink_mono(pin_obj, active_low, times=4, on_ms=250, off_ms=250):
     if pin_obj is None:
         print("Mono LED: (none configured)")
         return
     print("Mono LED blink test (active_low=%s)" % active_low)
+    al = 1 if active_low else 0; val = pin_obj.value   # bound once
     for _ in range(times):
-        mono_set(pin_obj, 1, active_low)
+        val(1 ^ al)
         time.sleep(on_ms/1000)
-        mono_set(pin_obj, 0, active_low)
+        val(al)
         time.sleep(off_ms/1000)
 
-def test_neopixel_on_pin(pin_no):
+def probe_neopixel_on_pin(pin_no):
+    # Init + one dark frame, no holds: the NeoPixel, or None if the pin can't drive it
     print("Trying NeoPixel on GPIO%d ..." % pin_no)
+    neopixel = load_neopixel()
+    if neopixel is None:
+        print("  ! 'neopixel' module not found in this firmware.")
+        return None
     try:
         np = neopixel.NeoPixel(Pin(pin_no, Pin.OUT), NEOPIXEL_COUNT)
+        show_np(np, NEOPIXEL_INDEX, OFF)
     except Exception as e:
         print("  ! Could not init NeoPixel on GPIO%d: %r" % (pin_no, e))
-        return False
+        return None
+    return np
 
+def visual_confirm(np, pin_no):
+    # The slow colour sequence, run once on the pin the probe pass picked
     try:
         # Red → Green → Blue (holds)
-        show_np(np, NEOPIXEL_INDEX, (255, 0, 0), NEOPIXEL_BRIGHTNESS); time.sleep(0.5)
-        show_np(np, NEOPIXEL_INDEX, (0, 255, 0), NEOPIXEL_BRIGHTNESS); time.sleep(0.5)
-        show_np(np, NEOPIXEL_INDEX, (0, 0, 255), NEOPIXEL_BRIGHTNESS); time.sleep(0.5)
-        # Blink blue
+        show_np(np, NEOPIXEL_INDEX, RED); time.sleep(0.5)
+        show_np(np, NEOPIXEL_INDEX, GREEN); time.sleep(0.5)
+        show_np(np, NEOPIXEL_INDEX, BLUE); time.sleep(0.5)
+        # Blink blue: swap whole frames (the driver's own byte order, captured
+        # from np.buf while blue) instead of re-setting the pixel
+        buf = np.buf; frame_blue = bytes(buf); frame_off = bytes(len(buf))
         for _ in range(6):
-            show_np(np, NEOPIXEL_INDEX, (0, 0, 255), NEOPIXEL_BRIGHTNESS)
+            buf[:] = frame_blue; np.write()
             time.sleep(0.25)
-            show_np(np, NEOPIXEL_INDEX, (0, 0, 0), 0.0)
+            buf[:] = frame_off; np.write()
             time.sleep(0.25)
         # Off
-        show_np(np, NEOPIXEL_INDEX, (0, 0, 0), 0.0)
+        show_np(np, NEOPIXEL_INDEX, OFF)
         print("  ✅ NeoPixel responded on GPIO%d" % pin_no)
         return True
     except Exception as e:
         print("  ! NeoPixel write failed on GPIO%d: %r" % (pin_no, e))
         return False
 
+def test_neopixel_on_pin(pin_no):
+    np = probe_neopixel_on_pin(pin_no)
+    return np is not None and visual_confirm(np, pin_no)
+
 def main():
     print("\n=== NeoPixel + Mono LED Diagnostic ===")
     if MONO_LED_PIN is not None:
@@ -92,17 +124,19 @@ def main():
         blink_mono(mono, not MONO_ACTIVE_LOW, times=4)
 
     # 2) Check neopixel module
-    if not HAVE_NP:
+    if load_neopixel() is None:
         print("❌ 'neopixel' module not found in this firmware. Install a build with NeoPixel support.")
         return
 
-    # 3) Try candidate pins for WS2812 DIN
+    # 3) Fast probe over the candidate pins, then one visual pass on the first that drives
     print("Testing candidate NeoPixel pins:", CANDIDATE_NP_PINS)
     worked = False
     for p in CANDIDATE_NP_PINS:
-        if test_neopixel_on_pin(p):
-            print(">>> Use NEOPIXEL_PIN = %d in your config.\n" % p)
-            worked = True
+        np = probe_neopixel_on_pin(p)
+        if np is not None:
+            if visual_confirm(np, p):
+                print(">>> Use NEOPIXEL_PIN = %d in your config.\n" % p)
+                worked = True
             break
 
     if not worked:
@@ -17,12 +17,6 @@ import sys
 import os
 from machine import Pin
 
-try:
-    import neopixel
-    HAVE_NP = True
-except ImportError:
-    HAVE_NP = False
-
 # ===================== USER SETTINGS =======================
 # Mono LED configuration (optional)
 # Set MONO_LED_PIN to the GPIO of a simple LED (or None if you do not have one)
@@ -85,22 +79,49 @@ def get_candidate_pins(board_family):
     return [8, 5, 4, 2, 18, 21]
 
 
-def show_np(np_obj, idx, rgb, brightness):
-    r, g, b = rgb
-    r_val = int(r * brightness)
-    g_val = int(g * brightness)
-    b_val = int(b * brightness)
-    np_obj[idx] = (r_val, g_val, b_val)
+# The board cannot change at runtime: detect once at import
+BOARD_FAMILY = detect_board_family()
+CANDIDATE_PINS = tuple(get_candidate_pins(BOARD_FAMILY))
+
+
+def precompute_color(rgb, brightness):
+    return (int(rgb[0] * brightness), int(rgb[1] * brightness), int(rgb[2] * brightness))
+
+
+# Test colours, scaled once (brightness is fixed for the whole run)
+RED = precompute_color((255, 0, 0), NEOPIXEL_BRIGHTNESS)
+GREEN = precompute_color((0, 255, 0), NEOPIXEL_BRIGHTNESS)
+BLUE = precompute_color((0, 0, 255), NEOPIXEL_BRIGHTNESS)
+OFF = (0, 0, 0)
+
+
+_neopixel = None   # module once imported, False when the firmware lacks it
+
+
+def load_neopixel():
+    # Imported on first NeoPixel use, not at module import: tools that only
+    # import this file (e.g. next to the HX711 scripts) don't pay for it
+    global _neopixel
+    if _neopixel is None:
+        try:
+            import neopixel
+            _neopixel = neopixel
+        except ImportError:
+            _neopixel = False
+    return _neopixel or None
+
+
+def show_np(np_obj, idx, color):
+    # color: one of the pre-scaled tuples above
+    np_obj[idx] = color
     np_obj.write()
 
 
 def mono_set(pin_obj, value, active_low):
     if pin_obj is None:
         return
-    if active_low:
-        pin_obj.value(0 if value else 1)
-    else:
-        pin_obj.value(1 if value else 0) if False else pin_obj.value(value)
+    # polarity as XOR: no branch per edge
+    pin_obj.value((1 if value else 0) ^ (1 if active_low else 0))
 
 
 def blink_mono(pin_obj, active_low, times, on_ms, off_ms):
@@ -110,45 +131,74 @@ def blink_mono(pin_obj, active_low, times, on_ms, off_ms):
 
     print("Mono LED blink test (active_low = %s)" % active_low)
 
+    # Polarity and pin method bound once for the whole blink
+    al = 1 if active_low else 0
+    val = pin_obj.value
+    on_s = on_ms / 1000.0
+    off_s = off_ms / 1000.0
     for _ in range(times):
-        mono_set(pin_obj, 1, active_low)
-        time.sleep(on_ms / 1000.0)
-        mono_set(pin_obj, 0, active_low)
-        time.sleep(off_ms / 1000.0)
+        val(1 ^ al)
+        time.sleep(on_s)
+        val(al)
+        time.sleep(off_s)
 
 
-def test_neopixel_on_pin(pin_no):
+def probe_neopixel_on_pin(pin_no):
+    """
+    Init the NeoPixel and write one dark frame, with no colour holds.
+    Returns the NeoPixel object, or None if this pin cannot drive it.
+    """
     print("Trying NeoPixel on GPIO %d ..." % pin_no)
 
+    neopixel = load_neopixel()
+    if neopixel is None:
+        print("  'neopixel' module not found in firmware.")
+        return None
+
     try:
         pin = Pin(pin_no, Pin.OUT)
         np_obj = neopixel.NeoPixel(pin, NEOPIXEL_COUNT)
+        show_np(np_obj, NEOPIXEL_INDEX, OFF)
     except Exception as e:
         print("  Could not init NeoPixel on this pin:", e)
-        return False
+        return None
+
+    return np_obj
+
 
+def visual_confirm(np_obj, pin_no):
+    """
+    Slow red / green / blue + blink sequence, run once on the pin
+    chosen by the probe pass.
+    """
     try:
         # Red
-        show_np(np_obj, NEOPIXEL_INDEX, (255, 0, 0), NEOPIXEL_BRIGHTNESS)
+        show_np(np_obj, NEOPIXEL_INDEX, RED)
         time.sleep(0.5)
 
         # Green
-        show_np(np_obj, NEOPIXEL_INDEX, (0, 255, 0), NEOPIXEL_BRIGHTNESS)
+        show_np(np_obj, NEOPIXEL_INDEX, GREEN)
         time.sleep(0.5)
 
         # Blue
-        show_np(np_obj, NEOPIXEL_INDEX, (0, 0, 255), NEOPIXEL_BRIGHTNESS)
+        show_np(np_obj, NEOPIXEL_INDEX, BLUE)
         time.sleep(0.5)
 
-        # Blink blue several times
+        # Blink blue several times: swap whole frames (the driver's own
+        # byte order, captured from np.buf while blue is shown)
+        buf = np_obj.buf
+        frame_blue = bytes(buf)
+        frame_off = bytes(len(buf))
         for _ in range(6):
-            show_np(np_obj, NEOPIXEL_INDEX, (0, 0, 255), NEOPIXEL_BRIGHTNESS)
+            buf[:] = frame_blue
+            np_obj.write()
             time.sleep(0.25)
-            show_np(np_obj, NEOPIXEL_INDEX, (0, 0, 0), 0.0)
+            buf[:] = frame_off
+            np_obj.write()
             time.sleep(0.25)
 
         # Off
-        show_np(np_obj, NEOPIXEL_INDEX, (0, 0, 0), 0.0)
+        show_np(np_obj, NEOPIXEL_INDEX, OFF)
 
         print("  NeoPixel responded on GPIO %d" % pin_no)
         return True
@@ -158,15 +208,17 @@ def test_neopixel_on_pin(pin_no):
         return False
 
 
+def test_neopixel_on_pin(pin_no):
+    np_obj = probe_neopixel_on_pin(pin_no)
+    return np_obj is not None and visual_confirm(np_obj, pin_no)
+
+
 def main():
     print("")
     print("=== NeoPixel Diagnostic for ESP32 family ===")
 
-    board_family = detect_board_family()
-    print("Detected board family:", board_family)
-
-    candidate_pins = get_candidate_pins(board_family)
-    print("Candidate NeoPixel DIN pins:", candidate_pins)
+    print("Detected board family:", BOARD_FAMILY)
+    print("Candidate NeoPixel DIN pins:", CANDIDATE_PINS)
 
     # Mono LED setup (optional)
     if MONO_LED_PIN is not None:
@@ -185,21 +237,24 @@ def main():
         blink_mono(mono_pin, not MONO_ACTIVE_LOW, times=4, on_ms=250, off_ms=250)
 
     # Step 3: check neopixel module presence
-    if not HAVE_NP:
+    if load_neopixel() is None:
         print("")
         print("Error: 'neopixel' module not found in firmware.")
         print("Use a MicroPython build that includes the neopixel module.")
         return
 
-    # Step 4: test all candidate GPIO pins
+    # Step 4: fast probe over the candidate pins, then one visual
+    #         confirmation on the first pin that drives a NeoPixel
     worked = False
-    for pin_no in candidate_pins:
-        ok = test_neopixel_on_pin(pin_no)
-        if ok:
+    for pin_no in CANDIDATE_PINS:
+        np_obj = probe_neopixel_on_pin(pin_no)
+        if np_obj is None:
+            continue
+        if visual_confirm(np_obj, pin_no):
             print("")
             print("Success: use NEOPIXEL DIN on GPIO %d." % pin_no)
             worked = True
-            break
+        break
 
     if not worked:
         print("")
@@ -8,6 +8,7 @@
 
 from lib.sensors.hx711_driver import HX711
 import s3_const as CFG
+import micropython
 import time
 
 KNOWN_GRAMS = 2000.0   # Change if your reference weight is different
@@ -29,18 +30,12 @@ def main():
 
     time.sleep(1.0)  # settle
 
-    # Debug: immediate reading after pressing Enter
-    instant = hx.get_value(times=10)
-    print("\nImmediate raw delta after Enter:", instant)
-
-    # Sample stability check (debug only)
-    print("Sampling raw values for stability:")
-    for i in range(5):
-        print(f"  Sample {i+1}: {hx.get_value(times=5)}")
-        time.sleep(0.2)
+    # One 40-sample pass: average for the SCALE plus the stability spread
+    # (samples already arrive ~100 ms apart, no extra sleeps needed)
+    raw, mn, mx, std = hx.read_stats(40)
+    print("\nRaw delta stats: avg=%.3f min=%.3f max=%.3f std=%.3f" % (raw, mn, mx, std))
 
     # 3) Compute SCALE
-    raw = hx.get_value(times=15)
     print(f"\nAverage raw delta for {KNOWN_GRAMS} g =", raw)
 
     scale = raw / KNOWN_GRAMS
@@ -64,11 +59,19 @@ def main():
     print("Step 3/3: Continuous logging started.")
     print("Remove weight, add weight, test movement.")
     print("Logging weight every 2 seconds...\n")
+    continuous_logging(hx)
+
 
+@micropython.native
+def continuous_logging(hx):
+    # Native code for the loop; locals because native does not speed up
+    # global lookups: one format string, bound methods looked up once
+    get_units = hx.get_units; now = time.time; sleep = time.sleep; _print = print
+    fmt = "[%d] Weight = %.2f g"
     while True:
-        grams = hx.get_units(times=20)     # smooth reading
-        print(f"[{time.time():.0f}] Weight = {grams:.2f} g")
-        time.sleep(2)
+        grams = get_units(times=20)     # smooth reading
+        _print(fmt % (now(), grams))
+        sleep(2)
 
 
 if __name__ == "__main__":
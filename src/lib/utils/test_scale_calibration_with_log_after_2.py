@@ -5,6 +5,7 @@
 
 from lib.sensors.hx711_driver import HX711
 import s3_const as CFG
+import micropython
 import time
 
 # Known calibration weight in grams
@@ -71,7 +72,8 @@ def calibrate_hx711():
     # -------------------------------------------------------------------------
     # Step 2b: Large averaging for calibration
     # -------------------------------------------------------------------------
-    raw_avg = hx.get_value(times=AVG_SAMPLES_CAL)
+    # batch=True: one viper kernel collects all samples (no per-read() dispatch)
+    raw_avg = hx.get_value(times=AVG_SAMPLES_CAL, batch=True)
     print("\nAverage raw delta for %.1f g = %0.6f" % (KNOWN_GRAMS, raw_avg))
 
     # Sanity check: raw must be "large enough"
@@ -92,7 +94,7 @@ def calibrate_hx711():
     # -------------------------------------------------------------------------
     # Step 2c: Verification
     # -------------------------------------------------------------------------
-    verify = hx.get_units(times=AVG_SAMPLES_VERIFY)
+    verify = hx.get_units(times=AVG_SAMPLES_VERIFY, batch=True)
     print(
         "\nVerification with %.1f g: %.3f grams"
         % (KNOWN_GRAMS, verify)
@@ -116,7 +118,7 @@ def calibrate_hx711():
 
             hx.set_scale(scale_final)
             time.sleep(0.5)
-            verify2 = hx.get_units(times=AVG_SAMPLES_VERIFY)
+            verify2 = hx.get_units(times=AVG_SAMPLES_VERIFY, batch=True)
             print("Re-check with corrected scale: %.3f grams" % verify2)
 
     # -------------------------------------------------------------------------
@@ -132,6 +134,7 @@ def calibrate_hx711():
     return hx, scale_final
 
 
+@micropython.native
 def continuous_logging(hx):
     print("===========================================")
     print(" Step 3/3: Continuous logging started.")
@@ -140,19 +143,23 @@ def continuous_logging(hx):
     print(" Press CTRL+C to stop.\n")
     print("===========================================\n")
 
+    # Loop locals (native code does not speed up global lookups): no
+    # module-dict / attribute lookups per line logged
+    get_units = hx.get_units; sleep = time.sleep; _print = print
+    n = AVG_SAMPLES_LOG; period = LOG_INTERVAL_SEC
+    fmt = "[%04d] Weight = %0.2f g"
     i = 0
-    while True:
-        try:
-            grams = hx.get_units(times=AVG_SAMPLES_LOG)
-            print("[%04d] Weight = %0.2f g" % (i, grams))
-            i += 1
-            time.sleep(LOG_INTERVAL_SEC)
-        except KeyboardInterrupt:
-            print("\nLogging stopped by user.")
-            break
-        except Exception as e:
-            print("Error during logging:", e)
-            time.sleep(LOG_INTERVAL_SEC)
+    try:
+        while True:
+            try:
+                grams = get_units(times=n)
+                _print(fmt % (i, grams))
+                i += 1
+            except Exception as e:
+                _print("Error during logging:", e)
+            sleep(period)
+    except KeyboardInterrupt:
+        print("\nLogging stopped by user.")
 
 
 def main():